@@ -1,13 +1,14 @@
 """
 Authentication API - Email-based authentication with hCaptcha
 """
-import os
 from fastapi import APIRouter, HTTPException, Depends, Header, Request
 from typing import Optional
 from pydantic import BaseModel, EmailStr, validator
+from app.config import get_settings
 from app.services.supabase_service import supabase_service
 from app.services.auth_client import auth_client
 from app.services.captcha_service import captcha_service
+from app.services.auth_executor import auth_executor
 from app.utils.validators import sanitize_string
 
 router = APIRouter()
@@ -99,7 +100,7 @@ async def signup(
         }
         
         try:
-            response = auth_client.client.auth.sign_up(signup_data)
+            response = await auth_executor.run(auth_client.client.auth.sign_up, signup_data)
         except Exception as supabase_error:
             error_msg = str(supabase_error).lower()
             if "captcha" in error_msg:
@@ -135,10 +136,12 @@ async def signup(
         
         # Insert or update user (use service role key for database operations)
         supabase_service._ensure_client()
-        result = supabase_service.client.table("users").upsert(
-            user_data,
-            on_conflict="id"
-        ).execute()
+        result = await auth_executor.run(
+            lambda: supabase_service.client.table("users").upsert(
+                user_data,
+                on_conflict="id"
+            ).execute()
+        )
         
         # Return response - if no session, user needs to confirm email
         if session:
@@ -211,7 +214,7 @@ async def signin(
         }
         
         try:
-            response = auth_client.client.auth.sign_in_with_password(signin_data)
+            response = await auth_executor.run(auth_client.client.auth.sign_in_with_password, signin_data)
         except Exception as supabase_error:
             error_msg = str(supabase_error).lower()
             if "captcha" in error_msg:
@@ -232,8 +235,13 @@ async def signin(
         # If user doesn't exist yet, create a basic record or use defaults
         supabase_service._ensure_client()
         try:
-            user_result = supabase_service.client.table("users").select("*").eq("id", response.user.id).single().execute()
+            user_result = await auth_executor.run(
+                lambda: supabase_service.client.table("users").select("*").eq("id", response.user.id).single().execute()
+            )
             user_data = user_result.data if user_result.data else {}
+        except HTTPException:
+            # Auth executor rejected the lookup (503); don't treat that as a missing user
+            raise
         except Exception as e:
             # User doesn't exist in users table yet - this can happen if:
             # 1. User signed up but record creation failed
@@ -256,8 +264,12 @@ async def signin(
             
             try:
                 # Try to insert the user record
-                supabase_service.client.table("users").insert(user_data).execute()
+                await auth_executor.run(
+                    lambda: supabase_service.client.table("users").insert(user_data).execute()
+                )
                 logger.info(f"Created user record for {response.user.id}")
+            except HTTPException:
+                raise
             except Exception as insert_error:
                 # If insert fails (e.g., RLS policy), just use empty dict
                 # User can still sign in, they just won't have profile data yet
@@ -314,8 +326,9 @@ async def forgot_password(
                 detail=f"Database configuration error: {str(e)}"
             )
         
-        frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
-        auth_client.client.auth.reset_password_for_email(
+        frontend_url = get_settings().frontend_url
+        await auth_executor.run(
+            auth_client.client.auth.reset_password_for_email,
             request_data.email,
             {
                 "redirect_to": f"{frontend_url}/reset-password"
@@ -347,9 +360,10 @@ async def reset_password(request_data: ResetPasswordRequest):
     try:
         # Update password via Supabase Auth
         supabase_service._ensure_client()
-        response = supabase_service.client.auth.update_user({
-            "password": request_data.new_password
-        })
+        response = await auth_executor.run(
+            supabase_service.client.auth.update_user,
+            {"password": request_data.new_password}
+        )
         
         # Note: The token is typically handled by Supabase Auth redirect
         # This endpoint is for programmatic password reset
@@ -359,6 +373,9 @@ async def reset_password(request_data: ResetPasswordRequest):
             "message": "Password has been reset successfully"
         }
         
+    except HTTPException:
+        # Auth executor full (503): retryable, not a failed reset
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=400,
@@ -380,7 +397,7 @@ async def signout(authorization: Optional[str] = Header(None)):
         # Sign out via Supabase Auth (use anon key for client-side auth)
         try:
             auth_client._ensure_client()
-            auth_client.client.auth.sign_out()
+            await auth_executor.run(auth_client.client.auth.sign_out)
         except ValueError as e:
             raise HTTPException(
                 status_code=500,
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends, Header, Query
-from typing import Optional, List
-from pydantic import BaseModel, validator
-from app.services.supabase_service import supabase_service
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
+from typing import Optional, List, Tuple
+from pydantic import BaseModel, Field, validator
+from app.services.supabase_service import supabase_service, BUSINESS_FIELDS
 from app.services.auth_service import auth_service
+from app.services.business_search import business_search_index
+from app.services.geocoding import GeocoderUnavailable, geocoding_service
+from app.utils.pagination import created_cursor, decode_created_cursor, set_next_cursor
+from app.utils.responses import trusted_response
 from app.utils.validators import sanitize_string, validate_phone, validate_email, validate_url
 
 router = APIRouter()
@@ -16,6 +20,9 @@ class BusinessCreate(BaseModel):
     website: Optional[str] = None
     address: Optional[str] = None
     image_url: Optional[str] = None
+    # Device coordinates; when omitted the address is geocoded
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     
     @validator('name')
     def validate_name(cls, v):
@@ -54,6 +61,8 @@ class BusinessUpdate(BaseModel):
     website: Optional[str] = None
     address: Optional[str] = None
     image_url: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 class BusinessResponse(BaseModel):
     id: str
@@ -67,14 +76,36 @@ class BusinessResponse(BaseModel):
     website: Optional[str]
     address: Optional[str]
     image_url: Optional[str]
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     created_at: str
     updated_at: str
     user: Optional[dict] = None  # Include user details
 
+class NearbyBusinessResponse(BusinessResponse):
+    distance_m: float
+
 async def get_user_id(authorization: Optional[str] = Header(None)) -> str:
     """Extract and verify user ID from authorization header"""
     return await auth_service.get_user_id_from_token(authorization)
 
+async def resolve_location(
+    address: Optional[str],
+    latitude: Optional[float],
+    longitude: Optional[float]
+) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Client-supplied coordinates if both are given, else the geocoded address
+    ((None, None) when the geocoder doesn't know it)
+
+    Raises:
+        GeocoderUnavailable: If the geocoder failed; the address may still be valid
+    """
+    if latitude is not None and longitude is not None:
+        return latitude, longitude
+    location = await geocoding_service.locate(address)
+    return location if location else (None, None)
+
 @router.post("/", response_model=BusinessResponse)
 async def create_business(
     business: BusinessCreate,
@@ -90,6 +121,12 @@ async def create_business(
         if not user.get("neighbourhood_id"):
             raise HTTPException(status_code=400, detail="User has no neighbourhood selected")
         
+        try:
+            latitude, longitude = await resolve_location(business.address, business.latitude, business.longitude)
+        except GeocoderUnavailable:
+            # Create without coordinates rather than fail the listing
+            latitude, longitude = None, None
+        
         # Create business listing
         business_data = {
             "user_id": user_id,
@@ -102,9 +139,16 @@ async def create_business(
             "website": business.website,
             "address": business.address,
             "image_url": business.image_url,
+            "latitude": latitude,
+            "longitude": longitude,
         }
         
         created_business = await supabase_service.create_business(business_data)
+        if created_business:
+            business_search_index.upsert({
+                **created_business,
+                "user": {key: user.get(key) for key in ("id", "name", "phone", "avatar_url")},
+            })
         return created_business
     except HTTPException:
         raise
@@ -113,22 +157,84 @@ async def create_business(
 
 @router.get("/", response_model=List[BusinessResponse])
 async def get_businesses(
+    response: Response,
     neighbourhood_id: Optional[str] = Query(None, description="Filter by neighbourhood"),
     user_id: Optional[str] = Query(None, description="Filter by user"),
     category: Optional[str] = Query(None, description="Filter by category"),
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (sparse fieldset)")
 ):
     """Get business listings with optional filters"""
+    select = BUSINESS_FIELDS.select(fields)
+    after = decode_created_cursor(cursor)
     try:
         businesses = await supabase_service.get_businesses(
             neighbourhood_id=neighbourhood_id,
             user_id=user_id,
             category=category,
             limit=limit,
-            offset=offset
+            offset=offset,
+            select=select,
+            cursor=after
+        )
+        result = trusted_response(businesses, BusinessResponse, sparse=select is not None)
+        return set_next_cursor(result, response, created_cursor(businesses, limit))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/search", response_model=List[BusinessResponse])
+async def search_businesses(
+    q: str = Query(..., description="Search query"),
+    neighbourhood_id: Optional[str] = Query(None, description="Filter by neighbourhood"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    limit: int = Query(50, ge=1, le=200),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (sparse fieldset)")
+):
+    """
+    Search business listings by name, category and description
+
+    Within a neighbourhood, results come from the in-memory index: typo
+    tolerant and ranked by relevance. Without one, falls back to the
+    database's substring search, newest first.
+    """
+    select = BUSINESS_FIELDS.select(fields)
+    try:
+        if neighbourhood_id:
+            businesses = await business_search_index.search(
+                neighbourhood_id, q, category=category, limit=limit
+            )
+            businesses = BUSINESS_FIELDS.project(businesses, fields)
+        else:
+            businesses = await supabase_service.search_businesses(
+                query=q,
+                category=category,
+                limit=limit,
+                select=select
+            )
+        return trusted_response(businesses, BusinessResponse, sparse=select is not None)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/nearby", response_model=List[NearbyBusinessResponse])
+async def get_nearby_businesses(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude of the search origin"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude of the search origin"),
+    radius_km: float = Query(2.0, gt=0, le=50, description="Search radius in kilometres"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """Businesses within radius_km of a point, nearest first, with their distance in metres"""
+    try:
+        businesses = await supabase_service.get_nearby_businesses(
+            latitude=lat,
+            longitude=lon,
+            radius_m=radius_km * 1000,
+            category=category,
+            limit=limit
         )
-        return businesses
+        return trusted_response(businesses, NearbyBusinessResponse)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -163,11 +269,22 @@ async def update_business(
         
         # Update business
         update_data = business_update.dict(exclude_unset=True)
+        # A new address moves the listing unless coordinates came with it
+        if "address" in update_data:
+            try:
+                update_data["latitude"], update_data["longitude"] = await resolve_location(
+                    update_data["address"], update_data.get("latitude"), update_data.get("longitude")
+                )
+            except GeocoderUnavailable:
+                # Keep the stored coordinates instead of wiping them on a transient failure
+                update_data.pop("latitude", None)
+                update_data.pop("longitude", None)
         updated_business = await supabase_service.update_business(business_id, update_data)
         
         if not updated_business:
             raise HTTPException(status_code=404, detail="Business not found or no changes made")
         
+        business_search_index.upsert({**existing_business, **updated_business})
         return updated_business
     except HTTPException:
         raise
@@ -190,28 +307,9 @@ async def delete_business(
             raise HTTPException(status_code=403, detail="Not authorized to delete this business")
         
         await supabase_service.delete_business(business_id)
+        business_search_index.remove(business_id)
         return None
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-
-@router.get("/search", response_model=List[BusinessResponse])
-async def search_businesses(
-    q: str = Query(..., description="Search query"),
-    neighbourhood_id: Optional[str] = Query(None, description="Filter by neighbourhood"),
-    category: Optional[str] = Query(None, description="Filter by category"),
-    limit: int = Query(50, ge=1, le=200)
-):
-    """Search business listings by name and description"""
-    try:
-        businesses = await supabase_service.search_businesses(
-            query=q,
-            neighbourhood_id=neighbourhood_id,
-            category=category,
-            limit=limit
-        )
-        return businesses
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
@@ -3,9 +3,15 @@ Enhanced health check and monitoring endpoints
 """
 from fastapi import APIRouter, Depends
 from typing import Dict, Any
-from app.services.supabase_service import supabase_service
-from app.services.onesignal_service import onesignal_service
-from app.services.storage_service import storage_service
+from app.services.health_probes import dependency_prober
+from app.services.http_client import http_clients
+from app.services.response_cache import response_cache
+from app.services.business_search import business_search_index
+from app.services.neighbourhood_catalog import neighbourhood_catalog
+from app.services.neighbourhood_resolver import neighbourhood_resolver
+from app.services.image_derivatives import image_derivatives
+from app.services.auth_executor import auth_executor
+from app.services.system_sampler import system_sampler
 
 router = APIRouter()
 
@@ -20,7 +26,7 @@ async def health_check() -> Dict[str, Any]:
 
 @router.get("/detailed")
 async def detailed_health_check() -> Dict[str, Any]:
-    """Detailed health check with service status"""
+    """Detailed health check with cached upstream probe results"""
     health_status = {
         "status": "healthy",
         "service": "neighbourhood-social-network-api",
@@ -28,64 +34,64 @@ async def detailed_health_check() -> Dict[str, Any]:
         "services": {}
     }
     
-    # Check Supabase
-    try:
-        supabase_service._ensure_client()
-        health_status["services"]["supabase"] = {
-            "status": "healthy",
-            "connected": supabase_service.client is not None
-        }
-    except Exception as e:
-        health_status["services"]["supabase"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-        health_status["status"] = "degraded"
+    if not dependency_prober.results:
+        # Probes haven't run yet (e.g. first request after startup); run them once now
+        await dependency_prober.probe_all()
     
-    # Check Storage
-    try:
-        storage_service._ensure_client()
-        health_status["services"]["storage"] = {
-            "status": "healthy",
-            "bucket": storage_service.bucket_name,
-            "connected": storage_service.client is not None
-        }
-    except Exception as e:
-        health_status["services"]["storage"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-        health_status["status"] = "degraded"
+    health_status["services"] = dependency_prober.snapshot()
     
-    # Check OneSignal
-    try:
-        onesignal_service._ensure_config()
-        health_status["services"]["onesignal"] = {
-            "status": "healthy",
-            "configured": True
-        }
-    except Exception as e:
-        health_status["services"]["onesignal"] = {
-            "status": "unhealthy",
-            "error": str(e),
-            "note": "OneSignal is optional"
-        }
-        # Don't mark as degraded if OneSignal fails (it's optional)
+    for name, result in health_status["services"].items():
+        if name == "onesignal":
+            # Don't mark as degraded if OneSignal fails (it's optional)
+            if result["status"] != "healthy":
+                result["note"] = "OneSignal is optional"
+            continue
+        if result["status"] != "healthy":
+            health_status["status"] = "degraded"
     
     return health_status
 
 @router.get("/metrics")
 async def metrics() -> Dict[str, Any]:
-    """Basic metrics endpoint"""
-    import psutil
-    import os
-    
-    process = psutil.Process(os.getpid())
-    
-    return {
-        "cpu_percent": process.cpu_percent(interval=0.1),
-        "memory_mb": process.memory_info().rss / 1024 / 1024,
-        "threads": process.num_threads(),
-        "open_files": len(process.open_files()),
-    }
+    """Latest process metrics and short trends from the background sampler"""
+    latest = system_sampler.latest()
+    if latest is None:
+        # Sampler not running yet (e.g. before startup completes); take one sample now
+        await system_sampler.sample()
+        latest = system_sampler.latest()
+    return latest
+
+@router.get("/http-clients")
+async def http_client_stats() -> Dict[str, Any]:
+    """Outbound HTTP connection pool and circuit breaker statistics"""
+    return http_clients.stats()
+
+@router.get("/auth-executor")
+async def auth_executor_stats() -> Dict[str, Any]:
+    """Queue-time and throughput statistics for the Supabase Auth thread pool"""
+    return auth_executor.stats()
+
+@router.get("/response-cache")
+async def response_cache_stats() -> Dict[str, Any]:
+    """Hit ratio and raw/precompressed sizes of the cached responses"""
+    return response_cache.stats()
+
+@router.get("/search-index")
+async def search_index_stats() -> Dict[str, Any]:
+    """Size of the in-memory business search indexes"""
+    return business_search_index.stats()
+
+@router.get("/neighbourhood-resolver")
+async def neighbourhood_resolver_stats() -> Dict[str, Any]:
+    """What the point-to-neighbourhood resolver has loaded"""
+    return neighbourhood_resolver.stats()
+
+@router.get("/neighbourhood-catalog")
+async def neighbourhood_catalog_stats() -> Dict[str, Any]:
+    """Version, size and refresh counters of the in-memory neighbourhood catalog"""
+    return neighbourhood_catalog.stats()
 
+@router.get("/image-derivatives")
+async def image_derivative_stats() -> Dict[str, Any]:
+    """Image derivative pool: formats, workers and outcome counters"""
+    return image_derivatives.stats()
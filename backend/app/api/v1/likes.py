@@ -6,6 +6,7 @@ from typing import Optional
 from pydantic import BaseModel
 from app.services.supabase_service import supabase_service
 from app.services.auth_service import auth_service
+from app.services.response_cache import response_cache
 
 router = APIRouter()
 
@@ -44,6 +45,8 @@ async def like_post(
         
         # Create like
         await supabase_service.create_post_like(post_id, user_id)
+        # The anonymous feed snapshot carries likes_count
+        response_cache.invalidate("feed", post["neighbourhood_id"])
         
         # Get updated likes count
         likes_count = await supabase_service.get_post_likes_count(post_id)
@@ -76,6 +79,8 @@ async def unlike_post(
         
         # Delete like
         await supabase_service.delete_post_like(post_id, user_id)
+        # The anonymous feed snapshot carries likes_count
+        response_cache.invalidate("feed", post["neighbourhood_id"])
         
         # Get updated likes count
         likes_count = await supabase_service.get_post_likes_count(post_id)
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends, Header, Query
-from typing import Optional, List
+import hashlib
+import json
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request, Response
+from typing import Optional, List, Dict
 from pydantic import BaseModel, validator
-from app.services.supabase_service import supabase_service
+from app.config import get_settings
+from app.services.response_cache import response_cache
+from app.services.supabase_service import supabase_service, MARKETPLACE_FIELDS, MARKETPLACE_SEARCH_FIELDS
 from app.services.auth_service import auth_service
+from app.utils.pagination import created_cursor, decode_created_cursor, decode_rank_cursor, encode_cursor, set_next_cursor
+from app.utils.responses import trusted_response
 from app.utils.validators import sanitize_string, validate_url
 
 router = APIRouter()
@@ -67,6 +73,23 @@ class MarketplaceItemResponse(BaseModel):
     updated_at: str
     user: Optional[dict] = None  # Include user details
 
+class PriceBucket(BaseModel):
+    min: float
+    max: Optional[float]  # None for the open-ended top bucket
+    count: int
+
+class MarketplaceFacetsResponse(BaseModel):
+    total: int
+    categories: Dict[str, int]
+    conditions: Dict[str, int]
+    price_buckets: List[PriceBucket]
+
+def _invalidate_facets(neighbourhood_id: Optional[str]):
+    """Drop cached facet counts affected by a write in this neighbourhood"""
+    response_cache.invalidate("marketplace_facets", neighbourhood_id)
+    # Facets requested without a neighbourhood cover every neighbourhood
+    response_cache.invalidate("marketplace_facets", None)
+
 async def get_user_id(authorization: Optional[str] = Header(None)) -> str:
     """Extract and verify user ID from authorization header"""
     return await auth_service.get_user_id_from_token(authorization)
@@ -100,6 +123,7 @@ async def create_marketplace_item(
         }
         
         created_item = await supabase_service.create_marketplace_item(item_data)
+        _invalidate_facets(user["neighbourhood_id"])
         return created_item
     except HTTPException:
         raise
@@ -108,14 +132,19 @@ async def create_marketplace_item(
 
 @router.get("/", response_model=List[MarketplaceItemResponse])
 async def get_marketplace_items(
+    response: Response,
     neighbourhood_id: Optional[str] = Query(None, description="Filter by neighbourhood"),
     user_id: Optional[str] = Query(None, description="Filter by user"),
     category: Optional[str] = Query(None, description="Filter by category"),
     status: Optional[str] = Query("available", description="Filter by status"),
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (sparse fieldset)")
 ):
     """Get marketplace items with optional filters"""
+    select = MARKETPLACE_FIELDS.select(fields)
+    after = decode_created_cursor(cursor)
     try:
         items = await supabase_service.get_marketplace_items(
             neighbourhood_id=neighbourhood_id,
@@ -123,9 +152,81 @@ async def get_marketplace_items(
             category=category,
             status=status,
             limit=limit,
-            offset=offset
+            offset=offset,
+            select=select,
+            cursor=after
+        )
+        result = trusted_response(items, MarketplaceItemResponse, sparse=select is not None)
+        return set_next_cursor(result, response, created_cursor(items, limit))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/facets", response_model=MarketplaceFacetsResponse)
+async def get_marketplace_facets(
+    request: Request,
+    neighbourhood_id: Optional[str] = Query(None, description="Filter by neighbourhood"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    condition: Optional[str] = Query(None, description="Filter by condition"),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    status: Optional[str] = Query("available", description="Filter by status")
+):
+    """Category, condition and price-bucket counts for a neighbourhood and filter set"""
+    filters = {
+        "category": category,
+        "condition": condition,
+        "min_price": min_price,
+        "max_price": max_price,
+        "status": status,
+    }
+    filter_hash = hashlib.sha1(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+
+    async def build():
+        return await supabase_service.get_marketplace_facets(neighbourhood_id=neighbourhood_id, **filters)
+
+    try:
+        entry = await response_cache.get_or_build(
+            ("marketplace_facets", neighbourhood_id, filter_hash),
+            get_settings().facets_cache_ttl,
+            build
+        )
+        return response_cache.respond(request, entry)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/search", response_model=List[MarketplaceItemResponse])
+async def search_marketplace_items(
+    response: Response,
+    q: Optional[str] = Query(None, description="Search query (supports \"quoted phrases\", OR and -exclusions)"),
+    query: Optional[str] = Query(None, description="Alias for q"),
+    neighbourhood_id: Optional[str] = Query(None, description="Filter by neighbourhood"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (sparse fieldset)")
+):
+    """Search marketplace items, best matches first (title weighted above description)"""
+    search_text = (q or query or "").strip()
+    if not search_text:
+        raise HTTPException(status_code=400, detail="Search query (q) is required")
+    select = MARKETPLACE_SEARCH_FIELDS.select(fields)
+    after = decode_rank_cursor(cursor)
+    try:
+        items = await supabase_service.search_marketplace_items(
+            query=search_text,
+            neighbourhood_id=neighbourhood_id,
+            category=category,
+            min_price=min_price,
+            max_price=max_price,
+            limit=limit,
+            select=select,
+            cursor=after
         )
-        return items
+        next_cursor = encode_cursor(items[-1]["rank"], items[-1]["id"]) if len(items) == limit else None
+        result = trusted_response(items, MarketplaceItemResponse, sparse=select is not None)
+        return set_next_cursor(result, response, next_cursor)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -161,6 +262,7 @@ async def update_marketplace_item(
         # Update item
         update_data = item_update.dict(exclude_unset=True)
         updated_item = await supabase_service.update_marketplace_item(item_id, update_data)
+        _invalidate_facets(existing_item.get("neighbourhood_id"))
         
         if not updated_item:
             raise HTTPException(status_code=404, detail="Item not found or no changes made")
@@ -187,32 +289,9 @@ async def delete_marketplace_item(
             raise HTTPException(status_code=403, detail="Not authorized to delete this item")
         
         await supabase_service.delete_marketplace_item(item_id)
+        _invalidate_facets(existing_item.get("neighbourhood_id"))
         return None
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-
-@router.get("/search", response_model=List[MarketplaceItemResponse])
-async def search_marketplace_items(
-    q: str = Query(..., description="Search query"),
-    neighbourhood_id: Optional[str] = Query(None, description="Filter by neighbourhood"),
-    category: Optional[str] = Query(None, description="Filter by category"),
-    min_price: Optional[float] = Query(None, ge=0),
-    max_price: Optional[float] = Query(None, ge=0),
-    limit: int = Query(50, ge=1, le=200)
-):
-    """Search marketplace items by title and description"""
-    try:
-        items = await supabase_service.search_marketplace_items(
-            query=q,
-            neighbourhood_id=neighbourhood_id,
-            category=category,
-            min_price=min_price,
-            max_price=max_price,
-            limit=limit
-        )
-        return items
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
@@ -0,0 +1,19 @@
+"""
+Prometheus metrics endpoint
+"""
+import asyncio
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.utils.metrics import request_metrics
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    """Request latency/size histograms and in-flight gauges in Prometheus text format"""
+    # Snapshot on the loop; reading and merging the worker files happens in a thread
+    text = await asyncio.to_thread(request_metrics.render, request_metrics.snapshot())
+    return PlainTextResponse(
+        text,
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
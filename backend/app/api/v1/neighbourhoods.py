@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException, Query
+import hmac
+from fastapi import APIRouter, Header, HTTPException, Query, Request
 from typing import Optional, List
 from pydantic import BaseModel
+from app.config import get_settings
+from app.services.neighbourhood_catalog import neighbourhood_catalog
+from app.services.neighbourhood_resolver import neighbourhood_resolver
+from app.services.response_cache import response_cache
 from app.services.supabase_service import supabase_service
+from app.utils.responses import project_rows
 
 router = APIRouter()
 
@@ -15,30 +21,81 @@ class NeighbourhoodResponse(BaseModel):
     longitude: Optional[float]
     created_at: str
 
+class ResolvedNeighbourhoodResponse(BaseModel):
+    neighbourhood: NeighbourhoodResponse
+    match: str  # "polygon" (inside its boundary) or "nearest" (closest centroid)
+    distance_m: float
+
 @router.get("/", response_model=List[NeighbourhoodResponse])
 async def get_neighbourhoods(
+    request: Request,
     city: Optional[str] = Query(None, description="Filter by city"),
     province: Optional[str] = Query(None, description="Filter by province"),
     search: Optional[str] = Query(None, description="Search by name"),
     limit: int = Query(100, ge=1, le=500, description="Maximum number of results")
 ):
-    """Get all neighbourhoods with optional filtering"""
+    """
+    Get all neighbourhoods with optional filtering
+
+    Served from the in-memory catalog snapshot (city/province match
+    case-insensitively, search matches a name or any word in it by prefix),
+    cached per snapshot version with precompressed bodies and ETags.
+    """
     try:
-        neighbourhoods = await supabase_service.get_neighbourhoods(
-            city=city,
-            province=province,
-            search=search,
-            limit=limit
+        snapshot = await neighbourhood_catalog.snapshot()
+
+        async def build():
+            return project_rows(snapshot.query(city, province, search, limit), NeighbourhoodResponse)
+
+        entry = await response_cache.get_or_build(
+            ("neighbourhoods", snapshot.version, city, province, search, limit),
+            get_settings().neighbourhoods_cache_ttl,
+            build
         )
-        return neighbourhoods
+        return response_cache.respond(request, entry, cache_control="public, max-age=60")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/catalog/refresh")
+async def refresh_catalog(x_catalog_secret: Optional[str] = Header(None)):
+    """
+    Change notification for the neighbourhood catalog (e.g. a Supabase
+    database webhook on the neighbourhoods table); reloads it immediately.
+    Other workers pick the change up on their next fingerprint check.
+    """
+    secret = get_settings().catalog_webhook_secret
+    if not secret:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not x_catalog_secret or not hmac.compare_digest(x_catalog_secret, secret):
+        raise HTTPException(status_code=403, detail="Invalid catalog secret")
+    try:
+        changed = await neighbourhood_catalog.refresh(force=True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"version": (await neighbourhood_catalog.snapshot()).version, "changed": changed}
+
+@router.get("/resolve", response_model=ResolvedNeighbourhoodResponse)
+async def resolve_neighbourhood(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude")
+):
+    """Neighbourhood whose boundary contains the point, else the one with the nearest centroid"""
+    try:
+        resolved = await neighbourhood_resolver.resolve(lat, lon)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if resolved is None:
+        raise HTTPException(status_code=404, detail="No neighbourhoods with boundaries or coordinates")
+    return resolved
 
 @router.get("/{neighbourhood_id}", response_model=NeighbourhoodResponse)
 async def get_neighbourhood(neighbourhood_id: str):
-    """Get a specific neighbourhood by ID"""
+    """Get a specific neighbourhood by ID (from the catalog; the database only for ids it doesn't have yet)"""
     try:
-        neighbourhood = await supabase_service.get_neighbourhood(neighbourhood_id)
+        snapshot = await neighbourhood_catalog.snapshot()
+        neighbourhood = snapshot.by_id.get(neighbourhood_id)
+        if neighbourhood is None:
+            neighbourhood = await supabase_service.get_neighbourhood(neighbourhood_id)
         if not neighbourhood:
             raise HTTPException(status_code=404, detail="Neighbourhood not found")
         return neighbourhood
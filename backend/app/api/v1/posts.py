@@ -1,10 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi import APIRouter, HTTPException, Depends, Header, Request
 from typing import Optional, List
 from pydantic import BaseModel, validator
 import re
 from app.services.supabase_service import supabase_service
 from app.services.onesignal_service import onesignal_service
 from app.services.auth_service import auth_service
+from app.config import get_settings
+from app.services.response_cache import response_cache
+from app.utils.responses import project_rows, trusted_response
 
 router = APIRouter()
 
@@ -99,6 +102,10 @@ async def create_post(
                         mentioned_user_id=mentioned_user["id"]
                     )
         
+        # Drop cached anonymous feed snapshots for this neighbourhood, now that
+        # the post and its mentions are all written
+        response_cache.invalidate("feed", user["neighbourhood_id"])
+        
         # If it's an alert, send notifications
         if post.type == "alert":
             neighbourhood_users = await supabase_service.get_neighbourhood_users(
@@ -127,38 +134,49 @@ async def create_post(
 
 @router.get("/", response_model=List[PostResponse])
 async def get_posts(
+    request: Request,
     neighbourhood_id: str,
     limit: int = 50,
     authorization: Optional[str] = Header(None)
 ):
     """Get posts for a neighbourhood"""
     try:
+        if not authorization:
+            # The anonymous feed is the same for everyone: serve a cached, precompressed snapshot
+            async def build():
+                posts = await supabase_service.get_posts(neighbourhood_id, limit)
+                # Even without auth, we can still include mentions (they're public)
+                for post in posts:
+                    post["mentions"] = await supabase_service.get_post_mentions(post["id"])
+                return project_rows(posts, PostResponse)
+
+            entry = await response_cache.get_or_build(
+                ("feed", neighbourhood_id, limit),
+                get_settings().feed_cache_ttl,
+                build
+            )
+            return response_cache.respond(request, entry)
+
         posts = await supabase_service.get_posts(neighbourhood_id, limit)
         
-        # If user is authenticated, include like status and mentions for each post
-        if authorization:
-            try:
-                user_id = await auth_service.get_user_id_from_token(authorization)
-                # Add like status and mentions to each post
-                for post in posts:
-                    like = await supabase_service.get_post_like(post["id"], user_id)
-                    post["user_liked"] = like is not None
-                    # Ensure likes_count is included (from database or calculated)
-                    if "likes_count" not in post or post["likes_count"] is None:
-                        post["likes_count"] = await supabase_service.get_post_likes_count(post["id"])
-                    # Get mentions for the post
-                    mentions = await supabase_service.get_post_mentions(post["id"])
-                    post["mentions"] = mentions
-            except Exception:
-                # If auth fails, just continue without like status
-                pass
-        else:
-            # Even without auth, we can still include mentions (they're public)
+        # Authenticated: include like status and mentions for each post
+        try:
+            user_id = await auth_service.get_user_id_from_token(authorization)
+            # Add like status and mentions to each post
             for post in posts:
+                like = await supabase_service.get_post_like(post["id"], user_id)
+                post["user_liked"] = like is not None
+                # Ensure likes_count is included (from database or calculated)
+                if "likes_count" not in post or post["likes_count"] is None:
+                    post["likes_count"] = await supabase_service.get_post_likes_count(post["id"])
+                # Get mentions for the post
                 mentions = await supabase_service.get_post_mentions(post["id"])
                 post["mentions"] = mentions
+        except Exception:
+            # If auth fails, just continue without like status
+            pass
         
-        return posts
+        return trusted_response(posts, PostResponse)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -204,7 +222,7 @@ async def get_user_posts(
             except Exception:
                 pass
         
-        return posts
+        return trusted_response(posts, PostResponse)
     except HTTPException:
         raise
     except Exception as e:
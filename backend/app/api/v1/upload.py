@@ -1,39 +1,104 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status, Header, Query
+import re
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Request
 from fastapi.responses import JSONResponse
 from typing import Optional
-from app.services.storage_service import storage_service
+from pydantic import BaseModel, validator
+from app.services.image_derivatives import UploadCopy, image_derivatives
+from app.services.storage_service import MAX_IMAGE_BYTES, storage_service
 from app.services.auth_service import auth_service
+from app.utils.multipart_stream import MultipartFileStream
 
 router = APIRouter()
 
+# Room for the multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
+FOLDER_PATTERN = r"[A-Za-z0-9_-]{1,64}"
+
+class SignedUploadRequest(BaseModel):
+    content_type: str
+    folder: Optional[str] = None
+
+    @validator('folder')
+    def validate_folder(cls, v):
+        if v is not None and not re.fullmatch(FOLDER_PATTERN, v):
+            raise ValueError("Folder may only contain letters, digits, '-' and '_'")
+        return v
+
+class UploadCompleteRequest(BaseModel):
+    path: str
+    ticket: str
+
 async def get_user_id(authorization: Optional[str] = Header(None)) -> str:
     """Extract and verify user ID from authorization header"""
     return await auth_service.get_user_id_from_token(authorization)
 
-@router.post("/image")
+@router.post(
+    "/image",
+    # The body is streamed by hand, so describe it for the docs
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                    }
+                }
+            },
+        }
+    },
+)
 async def upload_image(
-    file: UploadFile = File(...),
+    request: Request,
     folder: Optional[str] = Query(None, description="Folder name (default: 'posts')"),
     user_id: str = Depends(get_user_id)
 ):
     """
     Upload an image file to Supabase Storage
     
-    - **file**: Image file (JPEG, PNG, WebP, GIF)
+    - **file**: Image file (JPEG, PNG, WebP, GIF), max 5MB
     - **folder**: Optional folder name as query parameter (default: "posts")
     - **user_id**: Automatically extracted from auth token
     
+    The file is streamed to storage as it arrives and its type is detected
+    from its content. Oversized uploads are rejected with 413, up front when
+    Content-Length already says so, otherwise as soon as 5MB is passed.
+    
+    Resized AVIF/WebP copies are stored next to the original (EXIF
+    stripped) and returned under "derivatives" as srcset strings per
+    content type, with a "thumbnail" URL; "derivatives" is null when they
+    are disabled or could not be built.
+    
     Returns the public URL of the uploaded image.
     """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_IMAGE_BYTES + MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="File too large. Maximum size: 5MB"
+        )
+
     try:
         folder = folder or "posts"
-        image_url = await storage_service.upload_image(file, user_id, folder)
+        chunks = MultipartFileStream(request, "file")
+        derivatives = None
+        if image_derivatives.enabled:
+            # Keep a disk copy while streaming, for the derivative workers to decode
+            with UploadCopy() as copy:
+                image_url = await storage_service.upload_image(copy.tee(chunks), user_id, folder)
+                derivatives = await image_derivatives.generate(copy.path, image_url)
+        else:
+            image_url = await storage_service.upload_image(chunks, user_id, folder)
         
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "success": True,
                 "url": image_url,
+                "derivatives": derivatives,
                 "message": "Image uploaded successfully"
             }
         )
@@ -45,6 +110,53 @@ async def upload_image(
             detail=f"Upload failed: {str(e)}"
         )
 
+@router.post("/image/sign")
+async def sign_image_upload(
+    upload: SignedUploadRequest,
+    user_id: str = Depends(get_user_id)
+):
+    """
+    Get a short-lived signed URL to upload an image straight to storage
+    
+    - **content_type**: Type of the image to upload (JPEG, PNG, WebP, GIF)
+    - **folder**: Optional folder name (default: "posts")
+    
+    PUT the file to `upload_url` with that Content-Type (or use supabase-js
+    `uploadToSignedUrl(path, token, file)`), then call /image/complete with
+    `path` and `ticket` before `expires_at`. The path is always under
+    {folder}/{user_id}/.
+    """
+    signed = await storage_service.create_signed_upload(user_id, upload.folder or "posts", upload.content_type)
+    return JSONResponse(status_code=status.HTTP_200_OK, content={"success": True, **signed})
+
+@router.post("/image/complete")
+async def complete_image_upload(
+    upload: UploadCompleteRequest,
+    user_id: str = Depends(get_user_id)
+):
+    """
+    Confirm a signed upload and get its public URL
+    
+    - **path**, **ticket**: As returned by /image/sign
+    
+    The stored object is checked (at most 5MB, and really the image type its
+    path says) without downloading it; invalid or late uploads are deleted.
+    """
+    if not re.fullmatch(rf"{FOLDER_PATTERN}/{re.escape(user_id)}/[0-9a-f-]{{36}}\.(jpg|png|webp|gif)", upload.path):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Upload path does not belong to this user"
+        )
+    image_url = await storage_service.complete_signed_upload(upload.path, upload.ticket)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "success": True,
+            "url": image_url,
+            "message": "Image uploaded successfully"
+        }
+    )
+
 @router.delete("/image")
 async def delete_image(
     image_url: str,
@@ -0,0 +1,123 @@
+"""
+Application settings
+Parsed once from the environment and backend/.env. Hot paths read the
+current Settings object instead of calling os.getenv or load_dotenv.
+
+On SIGHUP the settings are re-read and swapped in as a whole, so a request
+sees either the old or the new values, never a mix. Settings used to size
+pools and middleware at startup (marked below) still need a restart.
+"""
+import logging
+from pathlib import Path
+from typing import Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+logger = logging.getLogger(__name__)
+
+ENV_FILE = Path(__file__).resolve().parent.parent / ".env"
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=ENV_FILE, extra="ignore")
+
+    # Supabase
+    supabase_url: Optional[str] = None
+    supabase_service_role_key: Optional[str] = None
+    supabase_anon_key: Optional[str] = None
+
+    # External services
+    onesignal_api_key: Optional[str] = None
+    onesignal_app_id: Optional[str] = None
+    hcaptcha_secret_key: Optional[str] = None
+    # Business address geocoding (app/services/geocoding.py)
+    geocoder: str = "nominatim"
+    geocoder_url: str = "https://nominatim.openstreetmap.org/search"
+    geocoder_country_codes: str = "za"
+    # Longest a listing write waits for a Nominatim request slot before skipping geocoding (seconds)
+    geocoder_max_wait: float = 3.0
+
+    # Unset means each caller keeps its historical default (see is_dev_mode)
+    dev_mode: Optional[bool] = None
+    environment: Optional[str] = None
+    frontend_url: str = "http://localhost:5173"
+
+    # Startup only
+    host: str = "0.0.0.0"
+    port: int = 8000
+    # Unset sizes the worker pool to the available CPUs (see server.py)
+    web_concurrency: Optional[int] = None
+    graceful_shutdown_timeout: float = 30.0
+    keepalive_timeout: int = 5
+    cors_origins: str = "*"
+    rate_limit_enabled: bool = True
+    rate_limit_per_minute: int = 60
+    auth_executor_workers: int = 8
+    auth_executor_max_queue: int = 100
+    access_log_queue_size: int = 10000
+    metrics_multiproc_dir: Optional[str] = None
+    system_metrics_interval: float = 5.0
+    health_probe_interval: float = 15.0
+    health_probe_timeout: float = 2.0
+    compression_minimum_size: int = 1024
+
+    # Access logging
+    access_log_sample_rate: float = 1.0
+    access_log_slow_ms: float = 1000.0
+
+    # List endpoints skip response_model validation (app/utils/responses.py)
+    trusted_responses: bool = True
+
+    # Response cache TTLs (seconds)
+    neighbourhoods_cache_ttl: float = 300.0
+    feed_cache_ttl: float = 15.0
+    facets_cache_ttl: float = 10.0
+
+    # Neighbourhood catalog (app/services/neighbourhood_catalog.py)
+    neighbourhood_catalog_refresh_interval: float = 60.0
+    # Shared secret for the catalog change webhook; unset disables the endpoint
+    catalog_webhook_secret: Optional[str] = None
+    # GeoJSON FeatureCollection of neighbourhood boundaries for /neighbourhoods/resolve
+    neighbourhood_boundaries_path: Optional[str] = None
+
+    # Lifetime of a signed direct upload, from signing to completion (seconds)
+    signed_upload_ttl: float = 600.0
+
+    # Responsive image derivatives (app/services/image_derivatives.py)
+    image_derivatives_enabled: bool = True
+    image_derivative_widths: str = "320,640,1080"
+    image_derivative_formats: str = "avif,webp"
+    image_derivative_quality: int = 70
+    image_derivative_workers: int = 2
+    image_derivative_max_queue: int = 8
+
+    # In-memory business search index: full rebuild interval, and how often a loaded
+    # index checks its neighbourhood's fingerprint for other workers' writes (seconds)
+    business_search_ttl: float = 600.0
+    business_search_check_interval: float = 5.0
+
+    # Supabase query instrumentation
+    query_budget: int = 25
+    query_budget_mode: str = "warn"
+    query_repeat_threshold: int = 5
+
+    def is_dev_mode(self, default: bool) -> bool:
+        """DEV_MODE if set, otherwise the caller's default"""
+        return default if self.dev_mode is None else self.dev_mode
+
+_settings = Settings()
+
+def get_settings() -> Settings:
+    """Current settings (usable as a FastAPI dependency)"""
+    return _settings
+
+def reload_settings() -> Settings:
+    """Re-read the environment and .env file and swap the settings in atomically"""
+    global _settings
+    try:
+        new_settings = Settings()
+    except Exception as e:
+        # Keep serving with the previous settings if the new ones don't parse
+        logger.error(f"Settings reload failed, keeping previous settings: {e}")
+        return _settings
+    _settings = new_settings
+    logger.info("Settings reloaded")
+    return _settings
@@ -0,0 +1,88 @@
+"""
+Response Compression Middleware
+Pure-ASGI gzip/brotli negotiation. Bodies below the size threshold, non-text
+content types and responses that already carry a Content-Encoding (such as
+precompressed cache entries) pass through untouched.
+"""
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.utils.compression import StreamCompressor, compress, is_compressible, negotiate
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        # Per-request compression trades ratio for speed; cached bodies use the maximum
+        self.levels = {"gzip": gzip_level, "br": brotli_quality}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            async def send_identity(message: Message) -> None:
+                # Shared caches must not serve this identity body to clients that accept compression
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    if is_compressible(headers.get("content-type")):
+                        headers.add_vary_header("Accept-Encoding")
+                await send(message)
+
+            await self.app(scope, receive, send_identity)
+            return
+
+        start_message: Optional[Message] = None
+        compressor: Optional[StreamCompressor] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body chunk shows the response size
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(scope=start_message)
+                compressible = (
+                    is_compressible(headers.get("content-type"))
+                    and "content-encoding" not in headers
+                    and "content-range" not in headers
+                )
+                if compressible:
+                    headers.add_vary_header("Accept-Encoding")
+                if not compressible or (not more_body and len(body) < self.minimum_size):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                headers["Content-Encoding"] = encoding
+                if not more_body:
+                    body = compress(body, encoding, self.levels[encoding])
+                    headers["Content-Length"] = str(len(body))
+                    passthrough = True
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+                # Streamed body: length is unknown up front
+                del headers["Content-Length"]
+                compressor = StreamCompressor(encoding, self.levels[encoding])
+                await send(start_message)
+
+            chunk = compressor.process(body)
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,59 +1,137 @@
 """
-Request Logging Middleware
+Request Logging
+Structured JSON access log written off the event loop.
+
+Records are pushed onto a bounded in-memory queue by a QueueHandler and
+formatted/written by a QueueListener thread. Successful requests can be
+sampled (ACCESS_LOG_SAMPLE_RATE); errors and slow requests
+(ACCESS_LOG_SLOW_MS) are always logged.
 """
-import time
+import json
 import logging
-from typing import Callable
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+import logging.handlers
+import queue
+import random
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
-class RequestLoggerMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Start timer
-        start_time = time.time()
-        
-        # Get request ID (set by error handler middleware)
-        request_id = getattr(request.state, "request_id", "unknown")
-        
-        # Log request
-        client_ip = request.client.host if request.client else "unknown"
-        logger.info(
-            f"{request.method} {request.url.path} - Client: {client_ip}",
-            extra={
-                "request_id": request_id,
-                "method": request.method,
-                "path": request.url.path,
-                "client": client_ip,
-                "query_params": str(request.query_params),
-                "user_agent": request.headers.get("user-agent", "unknown")
-            }
-        )
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Calculate duration
-        duration = time.time() - start_time
-        
-        # Log response
-        log_level = logging.WARNING if response.status_code >= 400 else logging.INFO
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update(getattr(record, "access", {}))
+        return json.dumps(payload, default=str)
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that defers formatting to the listener and drops when full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The queue is in-process, so the record can be handed over untouched;
+        # message merging and JSON encoding happen on the listener thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class AccessLogger:
+    def __init__(self):
+        self.queue: queue.Queue = queue.Queue(maxsize=get_settings().access_log_queue_size)
+        self.handler = NonBlockingQueueHandler(self.queue)
+
+        output = logging.StreamHandler()
+        output.setFormatter(JSONFormatter())
+        self.listener = logging.handlers.QueueListener(self.queue, output, respect_handler_level=False)
+        self._started = False
+
+        logger.addHandler(self.handler)
+        logger.setLevel(logging.INFO)
+        # Access records only go through the queue, never the root handlers
+        logger.propagate = False
+
+    def start(self):
+        """Start the background writer thread (application startup)"""
+        if not self._started:
+            self.listener.start()
+            self._started = True
+
+    def stop(self):
+        """Flush queued records and stop the writer thread (application shutdown)"""
+        if self._started:
+            self.listener.stop()
+            self._started = False
+
+    @property
+    def sample_rate(self) -> float:
+        return get_settings().access_log_sample_rate
+
+    @property
+    def slow_threshold(self) -> float:
+        return get_settings().access_log_slow_ms / 1000
+
+    def should_log(self, status_code: int, duration: float) -> bool:
+        """Errors and slow requests are always logged; the rest are sampled"""
+        if status_code >= 400 or duration >= self.slow_threshold:
+            return True
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def log(
+        self,
+        request_id: str,
+        method: str,
+        path: str,
+        status_code: int,
+        duration: float,
+        client_ip: str,
+        query_string: str,
+        user_agent: str,
+        db: Optional[Dict[str, Any]] = None
+    ):
+        """Log a completed request, with its Supabase query summary if any"""
+        if not self.should_log(status_code, duration) and not (db and db["repeated"]):
+            return
+        log_level = logging.WARNING if status_code >= 400 else logging.INFO
         logger.log(
             log_level,
-            f"{request.method} {request.url.path} - Status: {response.status_code} - Duration: {duration:.3f}s",
+            "%s %s - Status: %s - Duration: %.3fs",
+            method, path, status_code, duration,
             extra={
-                "request_id": request_id,
-                "method": request.method,
-                "path": request.url.path,
-                "status_code": response.status_code,
-                "duration": duration
+                "access": {
+                    "request_id": request_id,
+                    "method": method,
+                    "path": path,
+                    "status_code": status_code,
+                    "duration_ms": round(duration * 1000, 3),
+                    "slow": duration >= self.slow_threshold,
+                    "client": client_ip,
+                    "query_params": query_string,
+                    "user_agent": user_agent,
+                    "db": db
+                }
             }
         )
-        
-        # Add timing header
-        response.headers["X-Process-Time"] = f"{duration:.3f}"
-        
-        return response
 
+    def stats(self):
+        """Queue depth, dropped record count and sampling settings"""
+        return {
+            "queued": self.queue.qsize(),
+            "dropped": self.handler.dropped,
+            "sample_rate": self.sample_rate,
+            "slow_threshold_ms": self.slow_threshold * 1000,
+        }
+
+# Singleton instance; the listener is started and stopped in the app lifespan
+access_logger = AccessLogger()
@@ -0,0 +1,125 @@
+"""
+Request Pipeline Middleware
+Single pure-ASGI layer that assigns request IDs, applies rate limiting, logs
+requests and converts unhandled exceptions into the standard error envelope.
+Unlike BaseHTTPMiddleware it does not spawn a task or wrap the response body,
+so streaming responses pass straight through.
+"""
+import time
+import uuid
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from fastapi import status
+from app.middleware.error_handler import build_error_response
+from app.middleware.rate_limit import RateLimiter, logger as rate_limit_logger
+from app.middleware.request_logger import access_logger
+from app.services import query_instrumentation
+from app.utils.errors import create_error_response, ErrorCodes
+from app.utils.metrics import request_metrics
+
+class RequestPipelineMiddleware:
+    def __init__(self, app: ASGIApp, rate_limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.rate_limiter = rate_limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+
+        # Generate request ID (readable by handlers as request.state.request_id)
+        request_id = str(uuid.uuid4())[:8]
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        method = scope["method"]
+        path = scope["path"]
+        headers = Headers(scope=scope)
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+
+        extra_headers = {}
+        rate_limited = False
+        if self.rate_limiter is not None:
+            current_time = time.time()
+            client_id = self.rate_limiter.get_client_id(client_ip, headers.get("authorization", ""))
+            rate_limited = self.rate_limiter.is_rate_limited(client_id, current_time)
+            if rate_limited:
+                rate_limit_logger.warning(
+                    f"Rate limit exceeded for {client_id}",
+                    extra={
+                        "request_id": request_id,
+                        "client": client_id,
+                        "path": path
+                    }
+                )
+                extra_headers = self.rate_limiter.exceeded_headers()
+            else:
+                extra_headers = self.rate_limiter.limit_headers(client_id, current_time)
+
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        response_started = False
+        response_bytes = 0
+        request_metrics.request_started(method)
+        query_stats, query_token = query_instrumentation.begin_request()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_started, response_bytes
+            if message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            elif message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                response_headers = MutableHeaders(scope=message)
+                response_headers["X-Request-ID"] = request_id
+                response_headers["X-Process-Time"] = f"{time.perf_counter() - start_time:.3f}"
+                for name, value in extra_headers.items():
+                    response_headers[name] = value
+                # Supabase queries issued before the response started
+                response_headers["X-DB-Query-Count"] = str(query_stats.count)
+                response_headers["Server-Timing"] = f"db;dur={query_stats.total_time * 1000:.1f}"
+            await send(message)
+
+        try:
+            if rate_limited:
+                response = create_error_response(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Rate limit exceeded. Please try again later.",
+                    error_code=ErrorCodes.RATE_LIMIT_EXCEEDED,
+                    request_id=request_id
+                )
+                await response(scope, receive, send_wrapper)
+            else:
+                await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            if response_started:
+                # Too late to send an error envelope; let the server close the connection
+                raise
+            response = build_error_response(exc, request_id, method, path, client_ip)
+            await response(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            # Router sets scope["route"]; label by template, not raw path, to bound cardinality
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            query_summary = query_instrumentation.end_request(query_token, route_path)
+            request_metrics.request_finished(
+                route_path,
+                method,
+                status_code,
+                duration,
+                int(headers.get("content-length") or 0),
+                response_bytes
+            )
+            access_logger.log(
+                request_id,
+                method,
+                path,
+                status_code,
+                duration,
+                client_ip,
+                scope.get("query_string", b"").decode("latin-1"),
+                headers.get("user-agent", "unknown"),
+                query_summary
+            )
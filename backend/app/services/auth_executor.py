@@ -0,0 +1,103 @@
+"""
+Bounded thread pool for blocking Supabase Auth calls
+The supabase-py auth and table clients are synchronous; running them here keeps
+them off the event loop and caps how much of the worker an auth burst can take.
+"""
+import asyncio
+import contextvars
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from fastapi import HTTPException, status
+from app.config import get_settings
+
+class BoundedExecutor:
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._pending = 0
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+        self._queue_times = deque(maxlen=1000)
+        self._run_times = deque(maxlen=1000)
+
+    @staticmethod
+    def _timed_call(func: Callable, args: tuple, kwargs: dict):
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+            return started, time.perf_counter(), result, None
+        except Exception as e:
+            return started, time.perf_counter(), None, e
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking callable in the pool and await its result
+
+        Raises:
+            HTTPException: 503 if the pool and its queue are full
+            Exception: Whatever the callable raised
+        """
+        if self._pending >= self.max_workers + self.max_queue:
+            self._counters["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy. Please try again."
+            )
+
+        self._pending += 1
+        self._counters["submitted"] += 1
+        submitted = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            # Carry the request context (e.g. query stats) into the worker thread
+            context = contextvars.copy_context()
+            started, finished, result, error = await loop.run_in_executor(
+                self._executor, context.run, self._timed_call, func, args, kwargs
+            )
+        finally:
+            self._pending -= 1
+
+        self._queue_times.append(started - submitted)
+        self._run_times.append(finished - started)
+        if error is not None:
+            self._counters["failed"] += 1
+            raise error
+        self._counters["completed"] += 1
+        return result
+
+    @staticmethod
+    def _summary(samples: deque) -> Dict[str, float]:
+        if not samples:
+            return {"avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(samples)
+        return {
+            "avg_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus queue-time and run-time summaries over recent calls"""
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._pending,
+            **self._counters,
+            "queue_time": self._summary(self._queue_times),
+            "run_time": self._summary(self._run_times),
+        }
+
+    def shutdown(self):
+        """Stop accepting work and wait for running calls to finish"""
+        self._executor.shutdown(wait=True)
+
+# Singleton instance used by the /auth endpoints
+auth_executor = BoundedExecutor(
+    "supabase-auth",
+    max_workers=get_settings().auth_executor_workers,
+    max_queue=get_settings().auth_executor_max_queue
+)
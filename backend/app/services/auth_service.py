@@ -1,11 +1,11 @@
 """
 Authentication service for verifying Supabase JWT tokens
 """
-import os
 import jwt
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, status
-from supabase import create_client
+from app.config import get_settings
+from app.services.supabase_clients import supabase_clients
 
 # Import production JWT verifier (optional, falls back to dev mode)
 try:
@@ -15,15 +15,13 @@ except ImportError:
     PRODUCTION_JWT_AVAILABLE = False
 
 class AuthService:
-    def __init__(self):
-        self.supabase_url = os.getenv("SUPABASE_URL")
-        self.supabase_anon_key = os.getenv("SUPABASE_ANON_KEY")
-        
-        if not self.supabase_url or not self.supabase_anon_key:
-            # Allow service to be created without config (for dev mode)
-            self.supabase_client = None
-        else:
-            self.supabase_client = create_client(self.supabase_url, self.supabase_anon_key)
+    @property
+    def supabase_client(self):
+        """Shared anon-key client, or None when not configured (dev mode)"""
+        try:
+            return supabase_clients.get("anon")
+        except ValueError:
+            return None
     
     async def verify_token(self, token: str) -> Dict[str, Any]:
         """
@@ -63,7 +61,7 @@ class AuthService:
                 pass
         
         # Dev mode: decode without verification
-        dev_mode = os.getenv("DEV_MODE", "true").lower() == "true"
+        dev_mode = get_settings().is_dev_mode(default=True)
         if not dev_mode:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -152,7 +150,7 @@ class AuthService:
                 return user_data["user_id"]
             except HTTPException as e:
                 # If JWT verification fails, check if dev mode is enabled
-                dev_mode = os.getenv("DEV_MODE", "true").lower() == "true"  # Default to true
+                dev_mode = get_settings().is_dev_mode(default=True)
                 if dev_mode:
                     # Dev mode: try to extract user_id from token payload without verification
                     try:
@@ -181,7 +179,7 @@ class AuthService:
         else:
             # Not a JWT token, treat as user_id (dev mode)
             # In production, you might want to reject this
-            dev_mode = os.getenv("DEV_MODE", "true").lower() == "true"  # Default to true for backward compatibility
+            dev_mode = get_settings().is_dev_mode(default=True)  # Default to true for backward compatibility
             if dev_mode:
                 return token
             else:
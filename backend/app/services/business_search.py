@@ -0,0 +1,340 @@
+"""
+In-memory business directory search
+One index per neighbourhood over business name, category and description.
+Query terms are matched exactly, by prefix, or within a small edit distance
+(candidates come from a trigram index over the vocabulary), and documents
+are ranked with BM25 over field-weighted term frequencies.
+
+Indexes are loaded from Supabase on the first search in a neighbourhood and
+kept current by the create/update/delete endpoints of this worker. Writes
+handled by other workers are caught by comparing the neighbourhood's
+fingerprint (business count and latest updated_at) at most every
+BUSINESS_SEARCH_CHECK_INTERVAL seconds; the index is rebuilt when it changed,
+and in any case after BUSINESS_SEARCH_TTL seconds.
+"""
+import asyncio
+import bisect
+import math
+import re
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+from app.config import get_settings
+from app.services.neighbourhood_catalog import neighbourhood_catalog
+from app.services.supabase_service import supabase_service
+from app.utils.pagination import created_cursor
+
+# Field weights applied to term frequencies (BM25F-style)
+FIELD_WEIGHTS = {"name": 3.0, "category": 2.0, "description": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Score multipliers for inexact matches
+PREFIX_FACTOR = 0.8
+FUZZY_FACTORS = {1: 0.7, 2: 0.4}
+MAX_PREFIX_EXPANSIONS = 50
+LOAD_PAGE_SIZE = 1000
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase, accent-folded alphanumeric tokens"""
+    if not text:
+        return []
+    folded = unicodedata.normalize("NFKD", text)
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return _TOKEN.findall(folded.lower())
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def max_edits(term: str) -> int:
+    """Allowed typos for a query term: none for very short terms, two for long ones"""
+    if len(term) < 3:
+        return 0
+    return 1 if len(term) <= 5 else 2
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein (optimal string alignment) distance, or limit + 1 once it is exceeded"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+class _Document:
+    __slots__ = ("row", "terms", "length")
+
+    def __init__(self, row: Dict[str, Any]):
+        self.row = row
+        self.terms: Dict[str, float] = defaultdict(float)
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(row.get(field)):
+                self.terms[term] += weight
+        self.length = sum(self.terms.values())
+
+class NeighbourhoodIndex:
+    """Search index over one neighbourhood's businesses"""
+    def __init__(self, rows: Iterable[Dict[str, Any]] = (), fingerprint: Tuple[Any, ...] = ()):
+        self.built_at = time.monotonic()
+        self.checked_at = self.built_at
+        self.fingerprint = fingerprint
+        self._documents: Dict[str, _Document] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._vocabulary: List[str] = []  # sorted, for prefix lookups
+        self._total_length = 0.0
+        for row in rows:
+            self.add(row)
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    @property
+    def business_ids(self) -> Iterable[str]:
+        return self._documents.keys()
+
+    @property
+    def term_count(self) -> int:
+        return len(self._postings)
+
+    def add(self, row: Dict[str, Any]):
+        """Index a business row, replacing any previous version"""
+        business_id = str(row["id"])
+        self.remove(business_id)
+        document = _Document(row)
+        self._documents[business_id] = document
+        self._total_length += document.length
+        for term, frequency in document.terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                for gram in trigrams(term):
+                    self._trigrams[gram].add(term)
+                bisect.insort(self._vocabulary, term)
+            postings[business_id] = frequency
+
+    def remove(self, business_id: str):
+        document = self._documents.pop(business_id, None)
+        if document is None:
+            return
+        self._total_length -= document.length
+        for term in document.terms:
+            postings = self._postings[term]
+            del postings[business_id]
+            if not postings:
+                del self._postings[term]
+                for gram in trigrams(term):
+                    self._trigrams[gram].discard(term)
+                    if not self._trigrams[gram]:
+                        del self._trigrams[gram]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+
+    def _expand(self, token: str) -> Dict[str, float]:
+        """Indexed terms a query token matches, with their score multipliers"""
+        matches: Dict[str, float] = {}
+        if token in self._postings:
+            matches[token] = 1.0
+
+        if len(token) >= 2:
+            start = bisect.bisect_left(self._vocabulary, token)
+            for term in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+                if not term.startswith(token):
+                    break
+                matches.setdefault(term, PREFIX_FACTOR)
+
+        limit = max_edits(token)
+        if limit:
+            grams = trigrams(token)
+            shared: Dict[str, int] = defaultdict(int)
+            for gram in grams:
+                for term in self._trigrams.get(gram, ()):
+                    shared[term] += 1
+            # Each edit changes at most three trigrams
+            required = max(1, len(grams) - 3 * limit)
+            for term, count in shared.items():
+                if count < required or term in matches:
+                    continue
+                distance = edit_distance(token, term, limit)
+                if distance <= limit:
+                    matches[term] = FUZZY_FACTORS[distance]
+        return matches
+
+    def search(self, query: str, category: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Rows matching any query term, best BM25 score first (newest first on ties)"""
+        if not self._documents:
+            return []
+        count = len(self._documents)
+        average_length = self._total_length / count or 1.0
+        scores: Dict[str, float] = defaultdict(float)
+
+        for token in dict.fromkeys(tokenize(query)):
+            # A token counts once per document: its best-scoring expansion
+            best: Dict[str, float] = {}
+            for term, factor in self._expand(token).items():
+                postings = self._postings[term]
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for business_id, frequency in postings.items():
+                    norm = 1 - BM25_B + BM25_B * self._documents[business_id].length / average_length
+                    score = factor * idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * norm)
+                    if score > best.get(business_id, 0.0):
+                        best[business_id] = score
+            for business_id, score in best.items():
+                scores[business_id] += score
+
+        rows = [
+            (score, self._documents[business_id].row)
+            for business_id, score in scores.items()
+            if category is None or self._documents[business_id].row.get("category") == category
+        ]
+        rows.sort(key=lambda item: (item[0], item[1].get("created_at") or ""), reverse=True)
+        return [row for _, row in rows[:limit]]
+
+class BusinessSearchIndex:
+    """Per-neighbourhood indexes, loaded on demand and revalidated by fingerprint"""
+    def __init__(self, max_neighbourhoods: int = 256):
+        self.max_neighbourhoods = max_neighbourhoods
+        self._indexes: "OrderedDict[str, NeighbourhoodIndex]" = OrderedDict()
+        # Only while a neighbourhood is being checked or loaded
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = {}
+        # Writes that arrive while a neighbourhood loads, replayed onto the new index
+        self._writes_during_load: Dict[str, List[Tuple[str, Any]]] = {}
+        self._neighbourhood_of: Dict[str, str] = {}
+
+    async def search(
+        self,
+        neighbourhood_id: str,
+        query: str,
+        category: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        # Unknown ids would each cost a load and a cached empty index
+        snapshot = await neighbourhood_catalog.snapshot()
+        if neighbourhood_id not in snapshot.by_id:
+            return []
+        index = await self._index_for(neighbourhood_id)
+        return index.search(query, category=category, limit=limit)
+
+    @asynccontextmanager
+    async def _locked(self, neighbourhood_id: str) -> AsyncIterator[None]:
+        """Per-neighbourhood lock, dropped once nobody holds or waits for it"""
+        lock = self._locks.setdefault(neighbourhood_id, asyncio.Lock())
+        self._lock_users[neighbourhood_id] = self._lock_users.get(neighbourhood_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._lock_users[neighbourhood_id] -= 1
+            if not self._lock_users[neighbourhood_id]:
+                del self._lock_users[neighbourhood_id]
+                del self._locks[neighbourhood_id]
+
+    async def _index_for(self, neighbourhood_id: str) -> NeighbourhoodIndex:
+        index = self._indexes.get(neighbourhood_id)
+        if index is None or self._stale(index) or self._due_check(index):
+            # One check or load per neighbourhood at a time; concurrent searches wait for it
+            async with self._locked(neighbourhood_id):
+                index = self._indexes.get(neighbourhood_id)
+                if index is not None and not self._stale(index) and self._due_check(index):
+                    fingerprint = await supabase_service.get_businesses_fingerprint(neighbourhood_id)
+                    if fingerprint == index.fingerprint:
+                        index.checked_at = time.monotonic()
+                    else:
+                        index = None
+                if index is None or self._stale(index):
+                    index = await self._build(neighbourhood_id)
+                    self._store(neighbourhood_id, index)
+        self._indexes.move_to_end(neighbourhood_id)
+        return index
+
+    def _stale(self, index: NeighbourhoodIndex) -> bool:
+        return time.monotonic() - index.built_at > get_settings().business_search_ttl
+
+    def _due_check(self, index: NeighbourhoodIndex) -> bool:
+        return time.monotonic() - index.checked_at > get_settings().business_search_check_interval
+
+    async def _build(self, neighbourhood_id: str) -> NeighbourhoodIndex:
+        """Load a fresh index, including this worker's writes made while it loaded"""
+        writes = self._writes_during_load[neighbourhood_id] = []
+        try:
+            # Taken before the rows, so a write during the load shows up at the next check
+            fingerprint = await supabase_service.get_businesses_fingerprint(neighbourhood_id)
+            index = NeighbourhoodIndex(await self._load(neighbourhood_id), fingerprint)
+        finally:
+            del self._writes_during_load[neighbourhood_id]
+        for operation, value in writes:
+            if operation == "upsert":
+                index.add(value)
+            else:
+                index.remove(value)
+        return index
+
+    async def _load(self, neighbourhood_id: str) -> List[Dict[str, Any]]:
+        """Every business in the neighbourhood, paged by keyset"""
+        rows: List[Dict[str, Any]] = []
+        after = None
+        while True:
+            page = await supabase_service.get_businesses(
+                neighbourhood_id=neighbourhood_id, limit=LOAD_PAGE_SIZE, cursor=after
+            )
+            rows.extend(page)
+            if not created_cursor(page, LOAD_PAGE_SIZE):
+                return rows
+            after = [page[-1]["created_at"], page[-1]["id"]]
+
+    def _store(self, neighbourhood_id: str, index: NeighbourhoodIndex):
+        old = self._indexes.get(neighbourhood_id)
+        if old is not None:
+            self._forget(neighbourhood_id, old)
+        self._indexes[neighbourhood_id] = index
+        for business_id in index.business_ids:
+            self._neighbourhood_of[business_id] = neighbourhood_id
+        while len(self._indexes) > self.max_neighbourhoods:
+            evicted_id, evicted = self._indexes.popitem(last=False)
+            self._forget(evicted_id, evicted)
+
+    def _forget(self, neighbourhood_id: str, index: NeighbourhoodIndex):
+        for business_id in index.business_ids:
+            if self._neighbourhood_of.get(business_id) == neighbourhood_id:
+                del self._neighbourhood_of[business_id]
+
+    def upsert(self, row: Dict[str, Any]):
+        """Apply a created or updated business (no-op if its neighbourhood isn't loaded)"""
+        neighbourhood_id = str(row.get("neighbourhood_id"))
+        if neighbourhood_id in self._writes_during_load:
+            self._writes_during_load[neighbourhood_id].append(("upsert", row))
+        index = self._indexes.get(neighbourhood_id)
+        if index is not None:
+            index.add(row)
+            self._neighbourhood_of[str(row["id"])] = neighbourhood_id
+
+    def remove(self, business_id: str):
+        # The business's neighbourhood may not be known yet; removing an absent id is a no-op
+        for writes in self._writes_during_load.values():
+            writes.append(("remove", business_id))
+        neighbourhood_id = self._neighbourhood_of.pop(business_id, None)
+        if neighbourhood_id in self._indexes:
+            self._indexes[neighbourhood_id].remove(business_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "neighbourhoods": len(self._indexes),
+            "businesses": sum(len(index) for index in self._indexes.values()),
+            "terms": sum(index.term_count for index in self._indexes.values()),
+        }
+
+# Singleton instance
+business_search_index = BusinessSearchIndex()
@@ -1,25 +1,22 @@
 """
 hCaptcha verification service
 """
-import os
 import httpx
 from typing import Optional
 from fastapi import HTTPException, status
-from dotenv import load_dotenv
+from app.config import get_settings
+from app.services.http_client import http_clients
 
 class CaptchaService:
     def __init__(self):
-        # Load environment variables
-        load_dotenv()
-        self.secret_key = os.getenv("HCAPTCHA_SECRET_KEY")
         self.verify_url = "https://hcaptcha.com/siteverify"
     
+    @property
+    def secret_key(self) -> Optional[str]:
+        return get_settings().hcaptcha_secret_key
+    
     def _ensure_config(self):
         """Ensure hCaptcha is configured"""
-        # Reload env vars in case they were set after module import
-        load_dotenv()
-        if not self.secret_key:
-            self.secret_key = os.getenv("HCAPTCHA_SECRET_KEY")
         if not self.secret_key:
             raise ValueError("Missing hCaptcha secret key. Please set HCAPTCHA_SECRET_KEY in your .env file")
     
@@ -46,7 +43,7 @@ class CaptchaService:
             )
         
         # Allow test tokens in development mode
-        dev_mode = os.getenv("DEV_MODE", "false").lower() == "true"
+        dev_mode = get_settings().is_dev_mode(default=False)
         if dev_mode and captcha_token == "test_token":
             # Skip verification in dev mode with test token
             import logging
@@ -68,58 +65,59 @@ class CaptchaService:
             import logging
             logger = logging.getLogger(__name__)
             
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            try:
+                response = await http_clients.request(
+                    "hcaptcha",
+                    "POST",
+                    self.verify_url,
+                    data=data
+                )
+                
+                # Log response for debugging
+                logger.info(f"hCaptcha API response status: {response.status_code}")
+                
+                response.raise_for_status()
+                
+                # Parse JSON response
                 try:
-                    response = await client.post(
-                        self.verify_url,
-                        data=data
+                    result = response.json()
+                    logger.info(f"hCaptcha API response: {result}")
+                except Exception as json_error:
+                    logger.error(f"Failed to parse hCaptcha JSON response: {json_error}")
+                    logger.error(f"Response text: {response.text[:200]}")
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail="Failed to parse hCaptcha response"
                     )
+                
+                # Check verification result
+                if result.get("success"):
+                    return True
+                else:
+                    error_codes = result.get("error-codes", [])
+                    error_message = ", ".join(error_codes) if error_codes else "Verification failed"
                     
-                    # Log response for debugging
-                    logger.info(f"hCaptcha API response status: {response.status_code}")
-                    
-                    response.raise_for_status()
-                    
-                    # Parse JSON response
-                    try:
-                        result = response.json()
-                        logger.info(f"hCaptcha API response: {result}")
-                    except Exception as json_error:
-                        logger.error(f"Failed to parse hCaptcha JSON response: {json_error}")
-                        logger.error(f"Response text: {response.text[:200]}")
-                        raise HTTPException(
-                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="Failed to parse hCaptcha response"
-                        )
+                    logger.warning(f"hCaptcha verification failed: {error_message}, error codes: {error_codes}")
                     
-                    # Check verification result
-                    if result.get("success"):
-                        return True
-                    else:
-                        error_codes = result.get("error-codes", [])
-                        error_message = ", ".join(error_codes) if error_codes else "Verification failed"
-                        
-                        logger.warning(f"hCaptcha verification failed: {error_message}, error codes: {error_codes}")
-                        
-                        raise HTTPException(
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                            detail=f"hCaptcha verification failed: {error_message}"
-                        )
-                except HTTPException:
-                    # Re-raise HTTP exceptions
-                    raise
-                except httpx.HTTPStatusError as e:
-                    # Handle HTTP errors
-                    logger.error(f"hCaptcha HTTP error: {e.response.status_code} - {e.response.text[:200]}")
                     raise HTTPException(
-                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                        detail=f"hCaptcha service error: {e.response.status_code}"
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"hCaptcha verification failed: {error_message}"
                     )
-                except Exception as api_error:
-                    # Catch any other errors during API call
-                    logger.error(f"hCaptcha API call error: {str(api_error)}", exc_info=True)
-                    raise
-                
+            except HTTPException:
+                # Re-raise HTTP exceptions
+                raise
+            except httpx.HTTPStatusError as e:
+                # Handle HTTP errors
+                logger.error(f"hCaptcha HTTP error: {e.response.status_code} - {e.response.text[:200]}")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"hCaptcha service error: {e.response.status_code}"
+                )
+            except Exception as api_error:
+                # Catch any other errors during API call
+                logger.error(f"hCaptcha API call error: {str(api_error)}", exc_info=True)
+                raise
+            
         except httpx.TimeoutException:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -149,6 +147,6 @@ class CaptchaService:
             )
 
 # Singleton instance - will be created when module is imported
-# Environment variables are loaded in __init__ and _ensure_config
+# Configuration is read from get_settings() on each use
 captcha_service = CaptchaService()
 
@@ -0,0 +1,160 @@
+"""
+Address geocoding for business listings
+The backend is chosen with GEOCODER: "nominatim" (OpenStreetMap, default),
+"stub" (deterministic and offline, for local development and tests), "none",
+or a "package.module:ClassName" path to any Geocoder subclass.
+"""
+import asyncio
+import hashlib
+import importlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from app.config import get_settings
+from app.services.http_client import http_clients
+
+logger = logging.getLogger(__name__)
+
+Location = Tuple[float, float]
+
+class GeocoderUnavailable(Exception):
+    """The geocoder failed or was too busy; unlike a None result, says nothing about the address"""
+
+class Geocoder:
+    """Resolves a free-text address to (latitude, longitude); the base class finds nothing"""
+    async def geocode(self, address: str) -> Optional[Location]:
+        return None
+
+class StubGeocoder(Geocoder):
+    """
+    Offline geocoder: hashes the address to a stable point within ~10km of
+    Johannesburg, so the same address always lands on the same spot
+    """
+    ORIGIN = (-26.2041, 28.0473)
+    SPREAD_DEGREES = 0.09
+
+    async def geocode(self, address: str) -> Optional[Location]:
+        digest = hashlib.sha256(address.encode()).digest()
+        lat_offset = int.from_bytes(digest[:4], "big") / 0xFFFFFFFF * 2 - 1
+        lon_offset = int.from_bytes(digest[4:8], "big") / 0xFFFFFFFF * 2 - 1
+        return (
+            round(self.ORIGIN[0] + lat_offset * self.SPREAD_DEGREES, 6),
+            round(self.ORIGIN[1] + lon_offset * self.SPREAD_DEGREES, 6),
+        )
+
+class NominatimGeocoder(Geocoder):
+    """OpenStreetMap Nominatim search API (GEOCODER_URL, limited to GEOCODER_COUNTRY_CODES)"""
+    # Nominatim's usage policy allows at most one request per second
+    MIN_INTERVAL_SECONDS = 1.0
+
+    def __init__(self):
+        self._next_slot = 0.0
+
+    async def _wait_turn(self):
+        """
+        Space requests at least MIN_INTERVAL_SECONDS apart (per worker process)
+
+        Raises:
+            GeocoderUnavailable: If the next free slot is more than GEOCODER_MAX_WAIT away
+        """
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        if slot - now > get_settings().geocoder_max_wait:
+            raise GeocoderUnavailable("Geocoder busy; too many requests queued")
+        self._next_slot = slot + self.MIN_INTERVAL_SECONDS
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def geocode(self, address: str) -> Optional[Location]:
+        settings = get_settings()
+        await self._wait_turn()
+        response = await http_clients.request(
+            "geocoder",
+            "GET",
+            settings.geocoder_url,
+            params={
+                "q": address,
+                "format": "jsonv2",
+                "limit": 1,
+                "countrycodes": settings.geocoder_country_codes,
+            },
+            # Nominatim's usage policy requires an identifying User-Agent
+            headers={"User-Agent": "neighbourhood-api/1.0"},
+        )
+        response.raise_for_status()
+        results = response.json()
+        if not results:
+            return None
+        return float(results[0]["lat"]), float(results[0]["lon"])
+
+GEOCODERS = {
+    "none": Geocoder,
+    "stub": StubGeocoder,
+    "nominatim": NominatimGeocoder,
+}
+
+def load_geocoder(name: str) -> Geocoder:
+    """Instantiate a built-in geocoder by name, or a Geocoder subclass from "module:ClassName" """
+    if name in GEOCODERS:
+        return GEOCODERS[name]()
+    module_name, _, class_name = name.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown geocoder: {name}")
+    geocoder_class = getattr(importlib.import_module(module_name), class_name)
+    if not issubclass(geocoder_class, Geocoder):
+        raise ValueError(f"{name} is not a Geocoder")
+    return geocoder_class()
+
+class GeocodingService:
+    """Configured geocoder with an in-process cache of recent addresses (hits and misses)"""
+    def __init__(self, cache_size: int = 1024):
+        self.cache_size = cache_size
+        self._geocoder: Optional[Geocoder] = None
+        self._geocoder_name: Optional[str] = None
+        self._cache: "OrderedDict[str, Optional[Location]]" = OrderedDict()
+
+    @property
+    def geocoder(self) -> Geocoder:
+        # Rebuilt when GEOCODER changes on a settings reload
+        name = get_settings().geocoder
+        if self._geocoder is None or name != self._geocoder_name:
+            self._geocoder = load_geocoder(name)
+            self._geocoder_name = name
+            self._cache.clear()
+        return self._geocoder
+
+    async def locate(self, address: Optional[str]) -> Optional[Location]:
+        """
+        Coordinates for an address, or None if the geocoder doesn't know it
+
+        Raises:
+            GeocoderUnavailable: If the geocoder failed, was too busy or is
+                misconfigured (logged here; nothing else is raised), so callers
+                can keep coordinates they already have
+        """
+        if not address or not address.strip():
+            return None
+        try:
+            geocoder = self.geocoder
+        except Exception as e:
+            # Bad GEOCODER setting (unknown name, import error)
+            logger.error(f"Could not load geocoder {get_settings().geocoder}: {e}")
+            raise GeocoderUnavailable(str(e)) from e
+        key = " ".join(address.lower().split())
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        try:
+            location = await geocoder.geocode(address)
+        except Exception as e:
+            # Throttled, transport errors, open circuit (503), bad payloads, or a custom geocoder's bug
+            logger.warning(f"Geocoding failed for {self._geocoder_name}: {getattr(e, 'detail', e)}")
+            raise GeocoderUnavailable(str(getattr(e, "detail", e))) from e
+        self._cache[key] = location
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return location
+
+# Singleton instance
+geocoding_service = GeocodingService()
@@ -0,0 +1,135 @@
+"""
+Background dependency probes for /health/detailed
+Each upstream is probed on an interval with a short timeout; the endpoint only
+reads the cached results, so load-balancer health checks never hit Supabase.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.config import get_settings
+from app.services.http_client import http_clients
+from app.services.onesignal_service import onesignal_service
+from app.services.storage_service import storage_service
+from app.services.supabase_service import supabase_service
+
+logger = logging.getLogger(__name__)
+
+class DependencyProber:
+    def __init__(self, interval: float = 15.0, timeout: float = 2.0):
+        self.interval = interval
+        self.timeout = timeout
+        self.probes: Dict[str, Callable[[], Awaitable[Dict[str, Any]]]] = {
+            "supabase": self._probe_postgrest,
+            "storage": self._probe_storage,
+            "onesignal": self._probe_onesignal,
+        }
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _supabase_headers(self) -> Dict[str, str]:
+        supabase_service._ensure_client()
+        return {
+            "apikey": supabase_service.service_role_key,
+            "Authorization": f"Bearer {supabase_service.service_role_key}",
+        }
+
+    async def _probe_postgrest(self) -> Dict[str, Any]:
+        """Cheapest real query: one id from the neighbourhoods table"""
+        headers = self._supabase_headers()
+        response = await http_clients.request(
+            "supabase_probe",
+            "GET",
+            f"{supabase_service.url}/rest/v1/neighbourhoods",
+            params={"select": "id", "limit": "1"},
+            headers=headers,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return {"connected": True}
+
+    async def _probe_storage(self) -> Dict[str, Any]:
+        """Bucket metadata lookup (no object listing)"""
+        headers = self._supabase_headers()
+        bucket = storage_service.bucket_name
+        response = await http_clients.request(
+            "supabase_probe",
+            "GET",
+            f"{supabase_service.url}/storage/v1/bucket/{bucket}",
+            headers=headers,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return {"connected": True, "bucket": bucket}
+
+    async def _probe_onesignal(self) -> Dict[str, Any]:
+        """Reachability only: any non-5xx answer from the API host counts"""
+        onesignal_service._ensure_config()
+        response = await http_clients.request(
+            "onesignal",
+            "HEAD",
+            onesignal_service.api_url,
+            timeout=self.timeout,
+        )
+        if response.status_code >= 500:
+            raise RuntimeError(f"OneSignal returned {response.status_code}")
+        return {"configured": True}
+
+    async def _run_probe(self, name: str, probe: Callable[[], Awaitable[Dict[str, Any]]]):
+        start = time.perf_counter()
+        try:
+            details = await asyncio.wait_for(probe(), timeout=self.timeout)
+            result = {"status": "healthy", **details}
+        except asyncio.TimeoutError:
+            result = {"status": "unhealthy", "error": f"Probe timed out after {self.timeout}s"}
+        except Exception as e:
+            result = {"status": "unhealthy", "error": str(e)}
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        result["checked_at"] = time.time()
+        self.results[name] = result
+
+    async def probe_all(self):
+        """Run every probe concurrently and cache the results"""
+        await asyncio.gather(*(self._run_probe(name, probe) for name, probe in self.probes.items()))
+
+    async def _run(self):
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.warning(f"Dependency probes failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start probing in the background (application startup)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the probe task (application shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Cached results with their age; results older than 3 intervals are marked stale"""
+        now = time.time()
+        services = {}
+        for name, result in self.results.items():
+            age = now - result["checked_at"]
+            entry = {key: value for key, value in result.items() if key != "checked_at"}
+            entry["age_seconds"] = round(age, 1)
+            if age > self.interval * 3:
+                entry["status"] = "stale"
+            services[name] = entry
+        return services
+
+# Singleton instance; started in the app lifespan
+dependency_prober = DependencyProber(
+    interval=get_settings().health_probe_interval,
+    timeout=get_settings().health_probe_timeout
+)
@@ -0,0 +1,239 @@
+"""
+Shared outbound HTTP clients for external services
+One pooled httpx.AsyncClient per upstream, created lazily and closed on shutdown
+"""
+import logging
+import time
+from typing import Dict, Any, Optional
+import httpx
+
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to HTTP/1.1 keepalive
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Per-upstream settings: timeouts (seconds), pool limits and circuit breaker thresholds
+DEFAULT_SERVICE_CONFIG: Dict[str, Dict[str, Any]] = {
+    "onesignal": {
+        "timeout": 10.0,
+        "connect_timeout": 5.0,
+        "max_connections": 20,
+        "max_keepalive_connections": 10,
+    },
+    "hcaptcha": {
+        "timeout": 10.0,
+        "connect_timeout": 3.0,
+        "max_connections": 20,
+        "max_keepalive_connections": 10,
+    },
+    "geocoder": {
+        "timeout": 5.0,
+        "connect_timeout": 3.0,
+        "max_connections": 4,
+        "max_keepalive_connections": 2,
+    },
+    "supabase": {
+        "timeout": 10.0,
+        "connect_timeout": 3.0,
+        "max_connections": 10,
+        "max_keepalive_connections": 5,
+    },
+    # /health/detailed probes of PostgREST and Storage: own breaker, so a failing probe
+    # can't open the circuit for JWKS fetches (and vice versa)
+    "supabase_probe": {
+        "timeout": 2.0,
+        "connect_timeout": 2.0,
+        "max_connections": 2,
+        "max_keepalive_connections": 2,
+    },
+    # Streamed image uploads; a separate pool so slow uploads can't starve JWKS or health probes
+    "storage": {
+        "timeout": 30.0,
+        "connect_timeout": 3.0,
+        "max_connections": 20,
+        "max_keepalive_connections": 10,
+    },
+}
+
+class CircuitOpenError(httpx.RequestError):
+    """Raised when a request is short-circuited because the upstream is failing"""
+
+class CircuitBreaker:
+    """
+    Minimal closed/open/half-open circuit breaker
+
+    Opens after `failure_threshold` consecutive failures and lets a single
+    trial request through once `reset_timeout` seconds have passed; other
+    requests are rejected until that trial succeeds or fails.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent to the upstream"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.trial_in_flight = True
+                return True
+            return False
+        if self.state == self.HALF_OPEN:
+            if self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+        return True
+
+    def release_trial(self):
+        """Let another request be the trial when this one ended without an outcome (e.g. cancelled)"""
+        self.trial_in_flight = False
+
+    def record_success(self):
+        """Close the circuit after a successful call"""
+        self.consecutive_failures = 0
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        """Count a failure and open the circuit when the threshold is reached"""
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit opened for {self.name} after {self.consecutive_failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+class HTTPClientRegistry:
+    def __init__(self, service_config: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.service_config = service_config or DEFAULT_SERVICE_CONFIG
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _config(self, name: str) -> Dict[str, Any]:
+        if name not in self.service_config:
+            raise ValueError(f"Unknown HTTP service: {name}")
+        return self.service_config[name]
+
+    def get_client(self, name: str) -> httpx.AsyncClient:
+        """Get (or lazily create) the pooled client for a service"""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            config = self._config(name)
+            client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(config["timeout"], connect=config["connect_timeout"]),
+                limits=httpx.Limits(
+                    max_connections=config["max_connections"],
+                    max_keepalive_connections=config["max_keepalive_connections"],
+                    keepalive_expiry=config.get("keepalive_expiry", 30.0),
+                ),
+            )
+            self._clients[name] = client
+        return client
+
+    def open(self):
+        """Create every configured client up front (application startup)"""
+        for name in self.service_config:
+            self.get_client(name)
+
+    def get_breaker(self, name: str) -> CircuitBreaker:
+        """Get the circuit breaker for a service"""
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            config = self._config(name)
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=config.get("failure_threshold", 5),
+                reset_timeout=config.get("reset_timeout", 30.0),
+            )
+            self.breakers[name] = breaker
+        return breaker
+
+    async def request(self, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request through the pooled client for a service
+
+        Transport errors and 5xx responses count as failures for the circuit
+        breaker. The response is returned as-is; callers still decide whether
+        to call raise_for_status().
+
+        Raises:
+            CircuitOpenError: If the circuit for the service is open
+            httpx.RequestError: On transport failures
+        """
+        breaker = self.get_breaker(name)
+        counters = self._counters.setdefault(name, {"requests": 0, "failures": 0, "rejected": 0})
+
+        if not breaker.allow_request():
+            counters["rejected"] += 1
+            raise CircuitOpenError(f"Circuit open for {name}; upstream is unavailable")
+
+        is_trial = breaker.state == CircuitBreaker.HALF_OPEN
+        counters["requests"] += 1
+        try:
+            response = await self.get_client(name).request(method, url, **kwargs)
+        except httpx.RequestError:
+            counters["failures"] += 1
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled (e.g. a caller's wait_for timeout) or an unexpected error
+            if is_trial:
+                breaker.release_trial()
+            raise
+
+        if response.status_code >= 500:
+            counters["failures"] += 1
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool, counter and circuit breaker statistics per service"""
+        result = {}
+        for name in self.service_config:
+            breaker = self.breakers.get(name)
+            entry: Dict[str, Any] = {
+                **self._counters.get(name, {"requests": 0, "failures": 0, "rejected": 0}),
+                "circuit": breaker.state if breaker else CircuitBreaker.CLOSED,
+                "pool": self._pool_stats(self._clients.get(name)),
+            }
+            result[name] = entry
+        return {"http2": HTTP2_AVAILABLE, "services": result}
+
+    def _pool_stats(self, client: Optional[httpx.AsyncClient]) -> Dict[str, Any]:
+        if client is None or client.is_closed:
+            return {"open": False, "connections": 0, "idle": 0}
+        try:
+            # httpcore internals: the pool lives on the default transport
+            connections = client._transport._pool.connections
+            idle = sum(1 for conn in connections if conn.is_idle())
+            return {"open": True, "connections": len(connections), "idle": idle}
+        except AttributeError:
+            return {"open": True}
+
+    async def aclose(self):
+        """Close all pooled clients (called on application shutdown)"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+# Singleton instance - clients are created on first use
+http_clients = HTTPClientRegistry()
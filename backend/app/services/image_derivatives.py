@@ -0,0 +1,169 @@
+"""
+Responsive image derivatives for uploads
+While an upload streams to storage it is also copied to a temporary file.
+A process pool then decodes that copy once and encodes it at each of
+IMAGE_DERIVATIVE_WIDTHS in each of IMAGE_DERIVATIVE_FORMATS (AVIF, WebP),
+with EXIF stripped. The derivatives are stored next to the original as
+{name}_w{width}.{format}. Needs Pillow (AVIF needs a Pillow build with
+libavif); without it, uploads are stored without derivatives.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional
+from app.config import get_settings
+from app.services.storage_service import storage_service
+from app.utils.images import (
+    DERIVATIVE_FORMATS,
+    PIL_AVAILABLE,
+    derivative_path,
+    parse_formats,
+    parse_widths,
+    render_derivatives,
+    supported_formats,
+)
+
+logger = logging.getLogger(__name__)
+
+class UploadCopy:
+    """Temporary on-disk copy of an upload, written as its chunks pass through"""
+    def __init__(self):
+        self._file = tempfile.NamedTemporaryFile(prefix="upload-", delete=False)
+        self.path = self._file.name
+
+    async def tee(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        async for chunk in chunks:
+            # One chunk into the page cache; cheaper than a thread hop per chunk
+            self._file.write(chunk)
+            yield chunk
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "UploadCopy":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class ImageDerivativeService:
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._workers = 0
+        self._pending = 0
+        self._counters = {"generated": 0, "failed": 0, "skipped": 0}
+
+    @property
+    def enabled(self) -> bool:
+        settings = get_settings()
+        return settings.image_derivatives_enabled and bool(self.formats()) and bool(parse_widths(settings.image_derivative_widths))
+
+    def formats(self) -> List[str]:
+        return supported_formats(parse_formats(get_settings().image_derivative_formats))
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        workers = get_settings().image_derivative_workers
+        if self._executor is None or workers != self._workers:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            # spawn, not fork: the worker process has an event loop and threads running
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            self._workers = workers
+        return self._executor
+
+    async def generate(self, source_path: str, image_url: str) -> Optional[Dict[str, Any]]:
+        """
+        Build and store derivatives of an uploaded image
+
+        Never raises: the original is already stored, so a failure (or a full
+        queue) is logged and the upload is returned without derivatives.
+
+        Returns:
+            {"width", "height", "thumbnail": smallest URL,
+             "srcset": {content type: "url 320w, url 640w, ..."}}, or None
+        """
+        path = storage_service.object_path(image_url)
+        if not self.enabled or path is None:
+            return None
+        settings = get_settings()
+        if self._pending >= settings.image_derivative_workers + settings.image_derivative_max_queue:
+            self._counters["skipped"] += 1
+            logger.warning("Image derivative queue full; storing upload without derivatives")
+            return None
+
+        formats = self.formats()
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            width, height, rendered = await loop.run_in_executor(
+                self._get_executor(),
+                render_derivatives,
+                source_path,
+                parse_widths(settings.image_derivative_widths),
+                formats,
+                settings.image_derivative_quality,
+            )
+            urls = await asyncio.gather(*(
+                storage_service.put_object(
+                    derivative_path(path, label, name), data, DERIVATIVE_FORMATS[name][1]
+                )
+                for label, _, name, data in rendered
+            ))
+        except BrokenProcessPool as e:
+            # A worker died (e.g. out of memory); start a fresh pool next time
+            self._executor = None
+            self._counters["failed"] += 1
+            logger.error(f"Image derivative worker crashed: {e}")
+            return None
+        except Exception as e:
+            # Unreadable image, decompression bomb, or a derivative storage failed
+            self._counters["failed"] += 1
+            logger.warning(f"Image derivatives failed for {path}: {getattr(e, 'detail', e)}")
+            return None
+        finally:
+            self._pending -= 1
+
+        self._counters["generated"] += 1
+        thumbnail_format = "webp" if "webp" in formats else formats[0]
+        srcset: Dict[str, list] = {}
+        for (_, derivative_width, name, _), url in zip(rendered, urls):
+            srcset.setdefault(DERIVATIVE_FORMATS[name][1], []).append(f"{url} {derivative_width}w")
+        return {
+            "width": width,
+            "height": height,
+            # Smallest width, in WebP where configured since every browser decodes it
+            "thumbnail": next(url for (_, _, name, _), url in zip(rendered, urls) if name == thumbnail_format),
+            "srcset": {content_type: ", ".join(entries) for content_type, entries in srcset.items()},
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        settings = get_settings()
+        return {
+            "pillow": PIL_AVAILABLE,
+            "enabled": self.enabled,
+            "formats": self.formats(),
+            "widths": parse_widths(settings.image_derivative_widths),
+            "workers": settings.image_derivative_workers,
+            "in_flight": self._pending,
+            **self._counters,
+        }
+
+    def shutdown(self):
+        """Stop the worker processes (application shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+# Singleton instance; the worker processes start on the first upload
+image_derivatives = ImageDerivativeService()
@@ -2,18 +2,17 @@
 JWT Token Verifier with Supabase Public Key
 Production-ready JWT verification
 """
-import os
 import jwt
-import httpx
 import time
 from typing import Dict, Any, Optional
 from fastapi import HTTPException, status
 from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.backends import default_backend
+from app.config import get_settings
+from app.services.http_client import http_clients
 
 class JWTVerifier:
     def __init__(self):
-        self.supabase_url = os.getenv("SUPABASE_URL")
         self.public_key: Optional[rsa.RSAPublicKey] = None
         self.jwks_cache: Optional[Dict] = None
         self.cache_expiry: Optional[float] = None
@@ -29,16 +28,16 @@ class JWTVerifier:
         if self.public_key and self.cache_expiry and time.time() < self.cache_expiry:
             return self.public_key
         
-        if not self.supabase_url:
+        supabase_url = get_settings().supabase_url
+        if not supabase_url:
             raise ValueError("SUPABASE_URL not configured")
         
         try:
             # Fetch JWKS from Supabase
-            jwks_url = f"{self.supabase_url}/.well-known/jwks.json"
-            async with httpx.AsyncClient() as client:
-                response = await client.get(jwks_url, timeout=10.0)
-                response.raise_for_status()
-                jwks = response.json()
+            jwks_url = f"{supabase_url}/.well-known/jwks.json"
+            response = await http_clients.request("supabase", "GET", jwks_url)
+            response.raise_for_status()
+            jwks = response.json()
             
             # Extract public key from JWKS
             if not jwks.get("keys"):
@@ -128,7 +127,7 @@ class JWTVerifier:
             )
         except ValueError as e:
             # Public key fetch error - fallback to dev mode if enabled
-            dev_mode = os.getenv("DEV_MODE", "false").lower() == "true"
+            dev_mode = get_settings().is_dev_mode(default=False)
             if dev_mode:
                 # In dev mode, decode without verification
                 try:
@@ -0,0 +1,164 @@
+"""
+Memory-resident neighbourhood catalog
+The whole neighbourhoods table is held as an immutable, versioned snapshot
+with city, province and name-prefix indexes, so catalog lookups never touch
+the database. A background task compares a cheap fingerprint (row count and
+latest updated_at) every NEIGHBOURHOOD_CATALOG_REFRESH_INTERVAL seconds and
+reloads only when it changed; the change webhook forces a reload at once.
+"""
+import asyncio
+import bisect
+import logging
+import re
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import get_settings
+from app.services.response_cache import response_cache
+from app.services.supabase_service import supabase_service
+
+logger = logging.getLogger(__name__)
+
+_WORD_START = re.compile(r"\b\w")
+
+def _key(value: Optional[str]) -> str:
+    return " ".join((value or "").casefold().split())
+
+class CatalogSnapshot:
+    """One immutable version of the catalog; replaced on reload, never mutated"""
+    def __init__(self, version: int, rows: List[Dict[str, Any]], fingerprint: Tuple[Any, ...] = ()):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.loaded_at = time.monotonic()
+        # Same order as the old "ORDER BY name" query, so positions sort results
+        self.rows: Tuple[Dict[str, Any], ...] = tuple(sorted(rows, key=lambda row: _key(row.get("name"))))
+        self.by_id = {str(row["id"]): row for row in self.rows}
+
+        by_city: Dict[str, List[int]] = defaultdict(list)
+        by_province: Dict[str, List[int]] = defaultdict(list)
+        prefixes: List[Tuple[str, int]] = []
+        for position, row in enumerate(self.rows):
+            by_city[_key(row.get("city"))].append(position)
+            by_province[_key(row.get("province"))].append(position)
+            # Every word start, so "park" finds "Emmarentia Park North" and so does "park no"
+            name = _key(row.get("name"))
+            for match in _WORD_START.finditer(name):
+                prefixes.append((name[match.start():], position))
+        prefixes.sort()
+        self.by_city = {city: tuple(positions) for city, positions in by_city.items()}
+        self.by_province = {province: tuple(positions) for province, positions in by_province.items()}
+        self._prefix_keys = [key for key, _ in prefixes]
+        self._prefix_positions = [position for _, position in prefixes]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _name_matches(self, search: str) -> set:
+        start = bisect.bisect_left(self._prefix_keys, search)
+        positions = set()
+        for index in range(start, len(self._prefix_keys)):
+            if not self._prefix_keys[index].startswith(search):
+                break
+            positions.add(self._prefix_positions[index])
+        return positions
+
+    def query(
+        self,
+        city: Optional[str] = None,
+        province: Optional[str] = None,
+        search: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Neighbourhoods in name order, filtered by city and province
+        (case-insensitive) and by a name or name-word prefix
+        """
+        candidates: List[Any] = []
+        if city:
+            candidates.append(self.by_city.get(_key(city), ()))
+        if province:
+            candidates.append(self.by_province.get(_key(province), ()))
+        if search and _key(search):
+            candidates.append(self._name_matches(_key(search)))
+        if not candidates:
+            return list(self.rows[:limit])
+
+        # Walk the smallest candidate set, probe the others
+        candidates.sort(key=len)
+        others = [set(positions) for positions in candidates[1:]]
+        positions = sorted(position for position in candidates[0] if all(position in other for other in others))
+        return [self.rows[position] for position in positions[:limit]]
+
+class NeighbourhoodCatalog:
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.reloads = 0
+        self.checks = 0
+
+    async def snapshot(self) -> CatalogSnapshot:
+        """Current snapshot, loading the first one if the refresher hasn't yet"""
+        if self._snapshot is None:
+            await self.refresh()
+        return self._snapshot
+
+    async def refresh(self, force: bool = False) -> bool:
+        """
+        Reload the catalog if its fingerprint changed (always when forced)
+
+        Returns:
+            True if a new snapshot was published
+        """
+        async with self._lock:
+            self.checks += 1
+            fingerprint = await supabase_service.get_neighbourhoods_fingerprint()
+            current = self._snapshot
+            if current is not None and not force and fingerprint == current.fingerprint:
+                return False
+            rows = await supabase_service.get_all_neighbourhoods()
+            version = current.version + 1 if current else 1
+            self._snapshot = CatalogSnapshot(version, rows, fingerprint)
+            self.reloads += 1
+            # Cached list bodies belong to the previous version
+            response_cache.invalidate("neighbourhoods")
+            logger.info(f"Neighbourhood catalog v{version}: {len(rows)} neighbourhoods")
+            return True
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep serving the current snapshot
+                logger.warning(f"Neighbourhood catalog refresh failed: {e}")
+            await asyncio.sleep(get_settings().neighbourhood_catalog_refresh_interval)
+
+    def start(self):
+        """Load and keep refreshing in the background (application startup)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the refresh task (application shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "neighbourhoods": len(snapshot) if snapshot else 0,
+            "cities": len(snapshot.by_city) if snapshot else 0,
+            "age_seconds": round(time.monotonic() - snapshot.loaded_at, 1) if snapshot else None,
+            "checks": self.checks,
+            "reloads": self.reloads,
+        }
+
+# Singleton instance; refreshed in the app lifespan
+neighbourhood_catalog = NeighbourhoodCatalog()
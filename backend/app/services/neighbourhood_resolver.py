@@ -0,0 +1,144 @@
+"""
+Point -> neighbourhood resolution for onboarding
+Boundary polygons come from the GeoJSON file at NEIGHBOURHOOD_BOUNDARIES_PATH.
+Each feature carries the neighbourhood's id in properties.neighbourhood_id
+(or properties.id / the feature id). Lookups run in-process: an R-tree over
+polygon bounding boxes narrows the candidates for the point-in-polygon test.
+Points outside every polygon (or when no boundaries are configured) resolve
+to the neighbourhood with the nearest centroid (neighbourhoods.latitude/longitude).
+Neighbourhood rows come from the in-memory catalog.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import get_settings
+from app.services.neighbourhood_catalog import neighbourhood_catalog
+from app.utils.geo import Ring, RTree, haversine_m, point_in_polygon, ring_bbox
+
+logger = logging.getLogger(__name__)
+
+Boundary = Tuple[str, List[Ring]]  # neighbourhood id, polygon rings
+
+def load_boundaries(path: str) -> List[Boundary]:
+    """Polygons from a GeoJSON FeatureCollection, one entry per polygon part"""
+    with open(path, encoding="utf-8") as f:
+        collection = json.load(f)
+    boundaries: List[Boundary] = []
+    for feature in collection.get("features", []):
+        properties = feature.get("properties") or {}
+        neighbourhood_id = properties.get("neighbourhood_id") or properties.get("id") or feature.get("id")
+        geometry = feature.get("geometry") or {}
+        if not neighbourhood_id:
+            logger.warning("Skipping boundary feature without a neighbourhood id")
+            continue
+        if geometry.get("type") == "Polygon":
+            polygons = [geometry["coordinates"]]
+        elif geometry.get("type") == "MultiPolygon":
+            polygons = geometry["coordinates"]
+        else:
+            logger.warning(f"Skipping {geometry.get('type')} boundary for neighbourhood {neighbourhood_id}")
+            continue
+        for rings in polygons:
+            boundaries.append((str(neighbourhood_id), [[(float(x), float(y)) for x, y, *_ in ring] for ring in rings]))
+    return boundaries
+
+class NeighbourhoodResolver:
+    """
+    In-memory R-trees over neighbourhood boundaries and centroids
+
+    Rebuilt whenever the catalog publishes a new snapshot (or the boundaries
+    path changes); lookups never touch the database.
+    """
+    def __init__(self):
+        self._neighbourhoods: Dict[str, Dict[str, Any]] = {}
+        self._polygons = RTree([])
+        self._centroids = RTree([])
+        self._boundaries: List[Boundary] = []
+        self._boundaries_path: Optional[str] = None
+        self._catalog_version: Optional[int] = None
+        self.loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def _ensure_loaded(self):
+        snapshot = await neighbourhood_catalog.snapshot()
+        path = get_settings().neighbourhood_boundaries_path
+        if snapshot.version == self._catalog_version and path == self._boundaries_path:
+            return
+        async with self._lock:
+            if snapshot.version == self._catalog_version and path == self._boundaries_path:
+                return
+            if path != self._boundaries_path:
+                try:
+                    self._boundaries = await asyncio.to_thread(load_boundaries, path) if path else []
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    # Keep the previous boundaries rather than failing every lookup
+                    logger.error(f"Could not load neighbourhood boundaries from {path}: {e}")
+                self._boundaries_path = path
+            self.replace(list(snapshot.rows), self._boundaries)
+            self._catalog_version = snapshot.version
+            logger.info(
+                f"Neighbourhood resolver indexed {len(self._polygons)} boundary polygons "
+                f"and {len(self._centroids)} centroids (catalog v{snapshot.version})"
+            )
+
+    def replace(self, rows: List[Dict[str, Any]], boundaries: List[Boundary]):
+        """Index neighbourhood rows and their boundaries, replacing what was loaded"""
+        neighbourhoods = {str(row["id"]): row for row in rows}
+        polygon_entries = []
+        for neighbourhood_id, rings in boundaries:
+            if neighbourhood_id not in neighbourhoods:
+                logger.warning(f"Boundary for unknown neighbourhood {neighbourhood_id} ignored")
+                continue
+            polygon_entries.append((ring_bbox(rings[0]), (neighbourhood_id, rings)))
+        centroid_entries = []
+        for row in rows:
+            if row.get("latitude") is None or row.get("longitude") is None:
+                continue
+            lon, lat = float(row["longitude"]), float(row["latitude"])
+            centroid_entries.append(((lon, lat, lon, lat), (lon, lat, str(row["id"]))))
+
+        # Swap everything at once so a lookup never sees half a reload
+        self._neighbourhoods = neighbourhoods
+        self._polygons = RTree(polygon_entries)
+        self._centroids = RTree(centroid_entries)
+        self.loaded_at = time.monotonic()
+
+    def lookup(self, latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+        """
+        Resolve a point against the loaded data
+
+        Returns:
+            {"neighbourhood": row, "match": "polygon" | "nearest", "distance_m": float},
+            or None if no neighbourhood has a boundary or a centroid
+        """
+        neighbourhoods = self._neighbourhoods
+        for neighbourhood_id, rings in self._polygons.containing(longitude, latitude):
+            if point_in_polygon(longitude, latitude, rings):
+                return {"neighbourhood": neighbourhoods[neighbourhood_id], "match": "polygon", "distance_m": 0.0}
+
+        nearest = self._centroids.nearest(
+            longitude, latitude, lambda centroid: haversine_m(longitude, latitude, centroid[0], centroid[1])
+        )
+        if nearest is None:
+            return None
+        (_, _, neighbourhood_id), distance = nearest
+        return {"neighbourhood": neighbourhoods[neighbourhood_id], "match": "nearest", "distance_m": round(distance, 1)}
+
+    async def resolve(self, latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+        await self._ensure_loaded()
+        return self.lookup(latitude, longitude)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "neighbourhoods": len(self._neighbourhoods),
+            "polygons": len(self._polygons),
+            "centroids": len(self._centroids),
+            "boundaries_path": self._boundaries_path,
+            "catalog_version": self._catalog_version,
+            "age_seconds": round(time.monotonic() - self.loaded_at, 1) if self.loaded_at else None,
+        }
+
+# Singleton instance
+neighbourhood_resolver = NeighbourhoodResolver()
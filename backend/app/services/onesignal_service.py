@@ -1,13 +1,19 @@
-import os
-import httpx
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from app.config import get_settings
+from app.services.http_client import http_clients
 
 class OneSignalService:
     def __init__(self):
-        self.api_key = os.getenv("ONESIGNAL_API_KEY")
-        self.app_id = os.getenv("ONESIGNAL_APP_ID")
         self.api_url = "https://onesignal.com/api/v1/notifications"
     
+    @property
+    def api_key(self) -> Optional[str]:
+        return get_settings().onesignal_api_key
+    
+    @property
+    def app_id(self) -> Optional[str]:
+        return get_settings().onesignal_app_id
+    
     def _ensure_config(self):
         """Ensure OneSignal is configured"""
         if not self.api_key or not self.app_id:
@@ -37,10 +43,11 @@ class OneSignalService:
         if data:
             payload["data"] = data
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(self.api_url, json=payload, headers=headers)
-            response.raise_for_status()
-            return response.json()
+        response = await http_clients.request(
+            "onesignal", "POST", self.api_url, json=payload, headers=headers
+        )
+        response.raise_for_status()
+        return response.json()
     
     async def send_alert_notification(
         self,
@@ -0,0 +1,155 @@
+"""
+Supabase query instrumentation
+Wraps the Supabase client so every PostgREST query is timed and counted
+against the current request, with a query budget and an N+1 detector.
+
+Configuration:
+    QUERY_BUDGET            Max queries per request before flagging (0 disables)
+    QUERY_BUDGET_MODE       "warn" logs a warning, "raise" fails the request (for tests)
+    QUERY_REPEAT_THRESHOLD  Identical query shapes per request that count as a loop
+"""
+import contextvars
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+from app.config import get_settings
+from app.utils.metrics import request_metrics
+
+logger = logging.getLogger(__name__)
+
+# Filter methods whose first argument is a column name; values are left out of the shape
+_COLUMN_METHODS = {
+    "eq", "neq", "gt", "gte", "lt", "lte", "like", "ilike", "is_", "in_",
+    "contains", "contained_by", "order", "text_search", "match", "filter",
+}
+_OPERATIONS = ("select", "insert", "upsert", "update", "delete", "rpc")
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised in "raise" mode when a request goes over its query budget"""
+
+class QueryStats:
+    def __init__(self, budget: int, mode: str, repeat_threshold: int):
+        self.budget = budget
+        self.mode = mode
+        self.repeat_threshold = repeat_threshold
+        self.count = 0
+        self.total_time = 0.0
+        self.rows = 0
+        self.shapes: Counter = Counter()
+        self.repeated = []
+
+    def record(self, shape: str, duration: float, rows: int):
+        self.count += 1
+        self.total_time += duration
+        self.rows += rows
+        self.shapes[shape] += 1
+
+        if self.repeat_threshold and self.shapes[shape] == self.repeat_threshold:
+            self.repeated.append(shape)
+            logger.warning(f"Possible N+1 query: '{shape}' ran {self.repeat_threshold} times in one request")
+
+        if self.budget and self.mode == "raise" and self.count > self.budget:
+            raise QueryBudgetExceeded(f"Request exceeded query budget of {self.budget} (last: '{shape}')")
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "queries": self.count,
+            "time_ms": round(self.total_time * 1000, 3),
+            "rows": self.rows,
+            "repeated": [{"shape": shape, "count": self.shapes[shape]} for shape in self.repeated],
+        }
+
+_current_stats: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar(
+    "supabase_query_stats", default=None
+)
+
+def begin_request() -> Tuple[QueryStats, contextvars.Token]:
+    """Start counting queries for the current request"""
+    settings = get_settings()
+    stats = QueryStats(
+        budget=settings.query_budget,
+        mode=settings.query_budget_mode.lower(),
+        repeat_threshold=settings.query_repeat_threshold,
+    )
+    return stats, _current_stats.set(stats)
+
+def end_request(token: contextvars.Token, route: str) -> Optional[Dict[str, Any]]:
+    """Stop counting, log a budget warning if needed and return the request summary"""
+    stats = _current_stats.get()
+    _current_stats.reset(token)
+    if stats is None:
+        return None
+    if stats.budget and stats.count > stats.budget and stats.mode != "raise":
+        logger.warning(f"{route} ran {stats.count} Supabase queries (budget {stats.budget})")
+    return stats.summary()
+
+def _describe(method: str, args: tuple) -> str:
+    if method in _COLUMN_METHODS and args:
+        return f"{method}({args[0]})"
+    if method == "select" and args:
+        return f"select({','.join(str(a) for a in args)})"
+    return method
+
+def _row_count(response: Any) -> int:
+    data = getattr(response, "data", None)
+    if isinstance(data, list):
+        return len(data)
+    return 1 if data else 0
+
+class InstrumentedQuery:
+    """Proxy around a postgrest request builder that records its execute() call"""
+    __slots__ = ("_builder", "_table", "_shape")
+
+    def __init__(self, builder: Any, table: str, shape: Tuple[str, ...] = ()):
+        self._builder = builder
+        self._table = table
+        self._shape = shape
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            # Properties such as .not_ return a builder to keep chaining on
+            if hasattr(attr, "execute"):
+                return InstrumentedQuery(attr, self._table, self._shape + (name,))
+            return attr
+
+        def chained(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                return InstrumentedQuery(result, self._table, self._shape + (_describe(name, args),))
+            return result
+        return chained
+
+    def execute(self) -> Any:
+        start = time.perf_counter()
+        response = self._builder.execute()
+        duration = time.perf_counter() - start
+
+        operation = next((step for step in self._shape if step.split("(")[0] in _OPERATIONS), "query")
+        shape = f"{self._table}:" + ".".join(self._shape)
+
+        request_metrics.db_query_finished(self._table, operation.split("(")[0], duration)
+
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(shape, duration, _row_count(response))
+        return response
+
+class InstrumentedClient:
+    """Supabase client proxy whose table queries are instrumented"""
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    def table(self, table_name: str) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.table(table_name), table_name)
+
+    from_ = table
+
+    def rpc(self, fn: str, *args, **kwargs) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.rpc(fn, *args, **kwargs), f"rpc.{fn}", ("rpc",))
+
+    def __getattr__(self, name: str) -> Any:
+        # auth, storage etc. pass straight through
+        return getattr(self._client, name)
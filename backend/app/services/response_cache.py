@@ -0,0 +1,141 @@
+"""
+In-process cache for hot, shareable JSON responses
+Each entry keeps the serialized body together with its gzip/brotli variants,
+so compression is paid once per cached version instead of once per request.
+Entries expire after a TTL and can be invalidated by key prefix on writes.
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from fastapi import Request, Response
+from app.config import get_settings
+from app.utils.compression import SUPPORTED_ENCODINGS, compress, negotiate
+from app.utils.responses import DefaultJSONResponse
+
+CacheKey = Tuple[Any, ...]
+
+# Entries living shorter than this are rebuilt often (e.g. feed snapshots), so
+# they get moderate levels; max-effort brotli costs ~10x more for a few % smaller
+SHORT_TTL_SECONDS = 60.0
+SHORT_TTL_LEVELS = {"br": 5, "gzip": 6}
+
+class CachedBody:
+    """One cached version: raw JSON bytes, precompressed variants and an ETag"""
+    def __init__(self, body: bytes, ttl: float, minimum_size: int):
+        self.body = body
+        self.etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+        self.expires_at = time.monotonic() + ttl
+        self.encoded: Dict[str, bytes] = {}
+        if len(body) >= minimum_size:
+            for encoding in SUPPORTED_ENCODINGS:
+                level = SHORT_TTL_LEVELS[encoding] if ttl < SHORT_TTL_SECONDS else None
+                self.encoded[encoding] = compress(body, encoding, level)
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, CachedBody]" = OrderedDict()
+        # One build per key at a time; concurrent misses wait for it
+        self._building: Dict[CacheKey, asyncio.Future] = {}
+        # Bumped by invalidate(); a build that straddles one is served but not kept
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_build(self, key: CacheKey, ttl: float, build: Callable[[], Awaitable[Any]]) -> CachedBody:
+        """
+        Return the cached entry for key, building it with build() on a miss
+
+        build() returns JSON-serializable content; exceptions propagate and
+        nothing is cached. If the request running a build is cancelled (its
+        client went away), the requests waiting on it build again themselves.
+        """
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None and entry.fresh:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+            pending = self._building.get(key)
+            if pending is None:
+                break
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Only retry when it was the builder, not this request, that was cancelled
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._building[key] = future
+        generation = self._generation
+        try:
+            content = await build()
+            body = DefaultJSONResponse(content).body
+            # Compression releases the GIL; keep it off the event loop
+            entry = await asyncio.to_thread(CachedBody, body, ttl, get_settings().compression_minimum_size)
+            if generation == self._generation:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            future.set_result(entry)
+            return entry
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._building[key]
+
+    def invalidate(self, *prefix: Any):
+        """
+        Drop every entry whose key starts with prefix (all entries if none given)
+
+        Builds already running may have read the old data, so none of them is
+        cached either.
+        """
+        self._generation += 1
+        for key in [key for key in self._entries if key[:len(prefix)] == prefix]:
+            del self._entries[key]
+
+    def respond(self, request: Request, entry: CachedBody, cache_control: str = "no-cache") -> Response:
+        """Serve an entry: 304 on a matching If-None-Match, else the best precompressed variant"""
+        headers = {"ETag": entry.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and entry.etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        encoding = negotiate(request.headers.get("accept-encoding"), entry.encoded)
+        if encoding is None:
+            return Response(entry.body, media_type="application/json", headers=headers)
+        headers["Content-Encoding"] = encoding
+        return Response(entry.encoded[encoding], media_type="application/json", headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else None,
+            "raw_bytes": sum(len(entry.body) for entry in self._entries.values()),
+            "compressed_bytes": {
+                encoding: sum(len(entry.encoded.get(encoding, b"")) for entry in self._entries.values())
+                for encoding in SUPPORTED_ENCODINGS
+            },
+        }
+
+# Singleton instance
+response_cache = ResponseCache()
@@ -1,108 +1,298 @@
 """
 Storage service for handling file uploads to Supabase Storage
 """
-import os
+import hashlib
+import hmac
+import logging
+import time
 import uuid
-from typing import Optional, BinaryIO
-from fastapi import UploadFile, HTTPException, status
-from supabase import create_client
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Optional, Union
+from urllib.parse import parse_qs, urlsplit
+import httpx
+from fastapi import HTTPException, status
+from app.config import get_settings
+from app.services.http_client import http_clients
+from app.services.supabase_clients import supabase_clients
+from app.utils.images import SNIFF_BYTES, derivative_path, parse_formats, parse_widths, sniff_image_type
+
+logger = logging.getLogger(__name__)
+
+MAX_IMAGE_BYTES = 5 * 1024 * 1024  # 5MB
+
+# Content types a signed upload may declare -> stored extension
+UPLOAD_CONTENT_TYPES = {
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+}
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail="File too large. Maximum size: 5MB"
+    )
 
 class StorageService:
     def __init__(self):
-        self.supabase_url = os.getenv("SUPABASE_URL")
-        self.supabase_service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-        
-        if not self.supabase_url or not self.supabase_service_role_key:
-            self.client = None
-        else:
-            self.client = create_client(self.supabase_url, self.supabase_service_role_key)
         self.bucket_name = "post-images"  # Default bucket for post images
     
+    @property
+    def supabase_url(self) -> Optional[str]:
+        return supabase_clients.url()
+    
+    @property
+    def client(self):
+        """Shared service-role client, built on first use"""
+        return supabase_clients.get("service_role")
+    
     def _ensure_client(self):
-        """Ensure Supabase client is initialized"""
-        if self.client is None:
-            # Reload environment variables in case they were set after module import
-            self.supabase_url = os.getenv("SUPABASE_URL")
-            self.supabase_service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-            
-            if not self.supabase_url or not self.supabase_service_role_key:
-                raise ValueError("Missing Supabase environment variables. Please set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in your .env file")
-            self.client = create_client(self.supabase_url, self.supabase_service_role_key)
+        """Ensure Supabase client is initialized (raises ValueError if not configured)"""
+        supabase_clients.get("service_role")
     
     async def upload_image(
         self,
-        file: UploadFile,
+        chunks: AsyncIterable[bytes],
         user_id: str,
         folder: str = "posts"
     ) -> str:
         """
-        Upload an image file to Supabase Storage
-        
+        Stream an image to Supabase Storage
+
+        The format is sniffed from the first bytes (the client's content type
+        and filename are ignored) and each chunk is forwarded as it arrives, so
+        at most one chunk is held in memory. The upload is aborted as soon as
+        the running size passes MAX_IMAGE_BYTES.
+
         Args:
-            file: FastAPI UploadFile object
+            chunks: Image bytes, e.g. a MultipartFileStream
             user_id: User ID for organizing files
             folder: Folder name (e.g., "posts", "businesses")
-            
+
         Returns:
             Public URL of the uploaded image
-            
+
         Raises:
-            HTTPException: If upload fails
+            HTTPException: 400 for empty or unsupported files, 413 over 5MB,
+                500/503 if storage rejects the upload or is unreachable
         """
         self._ensure_client()
-        
-        # Validate file type
-        allowed_types = ["image/jpeg", "image/jpg", "image/png", "image/webp", "image/gif"]
-        if file.content_type not in allowed_types:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid file type. Allowed types: {', '.join(allowed_types)}"
-            )
-        
-        # Validate file size (max 5MB)
-        file_content = await file.read()
-        file_size = len(file_content)
-        max_size = 5 * 1024 * 1024  # 5MB
-        
-        if file_size > max_size:
+        iterator = chunks.__aiter__()
+
+        head = b""
+        while len(head) < SNIFF_BYTES:
+            try:
+                head += await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+
+        if not head:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File too large. Maximum size: 5MB"
+                detail="File is empty"
             )
-        
-        if file_size == 0:
+
+        image_type = sniff_image_type(head)
+        if image_type is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File is empty"
+                detail="Invalid file type. Allowed types: JPEG, PNG, WebP, GIF"
             )
-        
+        content_type, file_extension = image_type
+
+        if len(head) > MAX_IMAGE_BYTES:
+            raise _too_large()
+
+        async def body() -> AsyncIterator[bytes]:
+            size = len(head)
+            yield head
+            async for chunk in iterator:
+                size += len(chunk)
+                if size > MAX_IMAGE_BYTES:
+                    # Raising mid-body aborts the storage request, so nothing is stored
+                    raise _too_large()
+                yield chunk
+
         # Generate unique filename
-        file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
         unique_filename = f"{folder}/{user_id}/{uuid.uuid4()}.{file_extension}"
-        
+        return await self.put_object(unique_filename, body(), content_type)
+
+    async def put_object(
+        self,
+        path: str,
+        content: Union[bytes, AsyncIterable[bytes]],
+        content_type: str
+    ) -> str:
+        """
+        Store an object through the Storage REST API (an iterable is sent chunked)
+
+        Returns:
+            Public URL of the object
+
+        Raises:
+            HTTPException: 500 if storage rejects it, 503 if storage is unreachable
+        """
+        response = await self._storage_request(
+            "POST",
+            f"/object/{self.bucket_name}/{path}",
+            content=content,
+            headers={
+                "Content-Type": content_type,
+                "x-upsert": "false",  # Don't overwrite existing files
+            },
+        )
+        if response.status_code >= 400:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to upload image: {response.text}"
+            )
+
+        # Construct public URL manually (Supabase Storage public URL format)
+        return f"{self.public_url_prefix}{path}"
+
+    async def _storage_request(
+        self,
+        method: str,
+        endpoint: str,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Service-role request to the Storage REST API (endpoint relative to /storage/v1)
+
+        Raises:
+            HTTPException: 503 if storage is unreachable
+        """
+        service_key = supabase_clients.key("service_role")
         try:
-            # Upload to Supabase Storage
-            # Supabase Python client upload method
-            # Note: upsert should be a string "false" or omitted
-            response = self.client.storage.from_(self.bucket_name).upload(
-                path=unique_filename,
-                file=file_content,
-                file_options={
-                    "content-type": file.content_type,
-                    "upsert": "false"  # Don't overwrite existing files (must be string)
-                }
+            return await http_clients.request(
+                "storage",
+                method,
+                f"{self.supabase_url}/storage/v1{endpoint}",
+                headers={"Authorization": f"Bearer {service_key}", "apikey": service_key, **(headers or {})},
+                **kwargs,
             )
-            
-            # Construct public URL manually (Supabase Storage public URL format)
-            public_url = f"{self.supabase_url}/storage/v1/object/public/{self.bucket_name}/{unique_filename}"
-            
-            return public_url
-            
-        except Exception as e:
+        except httpx.RequestError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Storage unavailable: {str(e)}"
+            )
+
+    async def create_signed_upload(self, user_id: str, folder: str, content_type: str) -> Dict[str, Any]:
+        """
+        Reserve a path under {folder}/{user_id}/ and get a signed URL the client
+        uploads the file to directly (PUT, with the same Content-Type)
+
+        Returns:
+            {"path", "upload_url", "token", "ticket", "expires_at"}; the ticket is
+            passed back to complete_signed_upload
+
+        Raises:
+            HTTPException: 400 for an unsupported content type, 500/503 on storage errors
+        """
+        file_extension = UPLOAD_CONTENT_TYPES.get(content_type.lower())
+        if file_extension is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid file type. Allowed types: JPEG, PNG, WebP, GIF"
+            )
+        path = f"{folder}/{user_id}/{uuid.uuid4()}.{file_extension}"
+        response = await self._storage_request("POST", f"/object/upload/sign/{self.bucket_name}/{path}")
+        if response.status_code >= 400:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to upload image: {str(e)}"
+                detail=f"Failed to sign upload: {response.text}"
+            )
+        # e.g. "/object/upload/sign/post-images/posts/<user>/<uuid>.jpg?token=..."
+        signed_url = response.json()["url"]
+        expires_at = int(time.time() + get_settings().signed_upload_ttl)
+        return {
+            "path": path,
+            "upload_url": f"{self.supabase_url}/storage/v1{signed_url}",
+            "token": parse_qs(urlsplit(signed_url).query).get("token", [None])[0],
+            "ticket": self._upload_ticket(path, expires_at),
+            "expires_at": expires_at,
+        }
+
+    def _upload_ticket(self, path: str, expires_at: int) -> str:
+        # Keyed off the service-role key: stateless across workers, and rotating the key revokes tickets
+        key = hmac.new(supabase_clients.key("service_role").encode(), b"signed-upload-ticket", hashlib.sha256).digest()
+        signature = hmac.new(key, f"{path}\n{expires_at}".encode(), hashlib.sha256).hexdigest()
+        return f"{expires_at}.{signature}"
+
+    async def complete_signed_upload(self, path: str, ticket: str) -> str:
+        """
+        Validate a directly uploaded object before it is used
+
+        Reads only the object's size and first bytes. An object that is too
+        large, not the image type its extension claims, or completed after
+        the ticket expired is deleted.
+
+        Returns:
+            Public URL of the image
+
+        Raises:
+            HTTPException: 403 for a bad ticket, 404 if nothing was uploaded,
+                400/413 for invalid content, 410 if the upload window passed
+        """
+        expires_at, _, _ = ticket.partition(".")
+        if not expires_at.isdigit() or not hmac.compare_digest(ticket, self._upload_ticket(path, int(expires_at))):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Invalid upload ticket"
+            )
+
+        # Size from Content-Range, content type from the first bytes
+        response = await self._storage_request(
+            "GET",
+            f"/object/{self.bucket_name}/{path}",
+            headers={"Range": f"bytes=0-{SNIFF_BYTES - 1}"},
+        )
+        content_range = response.headers.get("content-range", "")
+        if response.status_code == 416:
+            # Range not satisfiable: the object is empty
+            size = 0
+        elif response.status_code >= 400:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Uploaded file not found"
             )
+        elif response.status_code == 206 and "/" in content_range:
+            size = int(content_range.rsplit("/", 1)[1])
+        else:
+            size = len(response.content)
+
+        error = None
+        if int(expires_at) < time.time():
+            error = HTTPException(status_code=status.HTTP_410_GONE, detail="Upload window expired")
+        elif size == 0:
+            error = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File is empty")
+        elif size > MAX_IMAGE_BYTES:
+            error = _too_large()
+        else:
+            image_type = sniff_image_type(response.content[:SNIFF_BYTES])
+            if image_type is None or image_type[1] != path.rsplit(".", 1)[-1]:
+                error = HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid file type. Allowed types: JPEG, PNG, WebP, GIF"
+                )
+        if error is not None:
+            await self._storage_request("DELETE", f"/object/{self.bucket_name}/{path}")
+            raise error
+
+        return f"{self.public_url_prefix}{path}"
+
+    @property
+    def public_url_prefix(self) -> str:
+        return f"{self.supabase_url}/storage/v1/object/public/{self.bucket_name}/"
+
+    def object_path(self, image_url: str) -> Optional[str]:
+        """Path within the bucket for one of its public URLs, or None for any other URL"""
+        prefix = self.public_url_prefix
+        if not image_url.startswith(prefix) or len(image_url) == len(prefix):
+            return None
+        return image_url[len(prefix):]
     
     async def delete_image(self, image_url: str) -> bool:
         """
@@ -137,13 +327,19 @@ class StorageService:
             else:
                 return False
             
-            # Delete file
-            self.client.storage.from_(self.bucket_name).remove([path])
+            # Delete the file and any derivatives stored next to it
+            settings = get_settings()
+            derivatives = [
+                derivative_path(path, width, extension)
+                for width in parse_widths(settings.image_derivative_widths)
+                for extension in parse_formats(settings.image_derivative_formats)
+            ]
+            self.client.storage.from_(self.bucket_name).remove([path, *derivatives])
             return True
             
         except Exception as e:
             # Log error but don't fail (file might not exist)
-            print(f"Error deleting image: {e}")
+            logger.warning(f"Error deleting image: {e}")
             return False
     
     def get_public_url(self, file_path: str) -> str:
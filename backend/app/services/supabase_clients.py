@@ -0,0 +1,68 @@
+"""
+Shared Supabase client factory
+Clients are built lazily, once per (url, key role), and shared by every
+service that needs that role. The supabase package itself is only imported
+when the first client is built, which keeps it out of cold-start import time.
+"""
+import threading
+from typing import Any, Dict, Optional, Tuple
+from app.config import get_settings
+from app.services.query_instrumentation import InstrumentedClient
+
+# Key role -> settings field (and environment variable) holding the key
+KEY_ROLES = {
+    "service_role": "supabase_service_role_key",
+    "anon": "supabase_anon_key",
+}
+
+class SupabaseClientFactory:
+    def __init__(self):
+        # (url, role) -> (key the client was built with, client)
+        self._clients: Dict[Tuple[str, str], Tuple[str, Any]] = {}
+        # Auth endpoints may ask for a client from executor threads
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def url() -> Optional[str]:
+        return get_settings().supabase_url
+
+    @staticmethod
+    def key(role: str) -> Optional[str]:
+        return getattr(get_settings(), KEY_ROLES[role])
+
+    def get(self, role: str) -> InstrumentedClient:
+        """
+        Get the shared client for a key role
+
+        Raises:
+            ValueError: If SUPABASE_URL or the role's key is not configured
+        """
+        url, key = self.url(), self.key(role)
+        if not url or not key:
+            raise ValueError(
+                f"Missing Supabase environment variables. Please set SUPABASE_URL and {KEY_ROLES[role].upper()} in your .env file"
+            )
+
+        cache_key = (url, role)
+        entry = self._clients.get(cache_key)
+        # A changed key (settings reload after rotation) rebuilds the client
+        if entry is None or entry[0] != key:
+            with self._lock:
+                entry = self._clients.get(cache_key)
+                if entry is None or entry[0] != key:
+                    from supabase import create_client
+                    entry = (key, InstrumentedClient(create_client(url, key)))
+                    self._clients[cache_key] = entry
+        return entry[1]
+
+    def warm(self):
+        """Build every configured client up front (called from the app lifespan)"""
+        for role in KEY_ROLES:
+            try:
+                self.get(role)
+            except ValueError:
+                # Role not configured; requests needing it will report the error
+                pass
+
+# Singleton instance
+supabase_clients = SupabaseClientFactory()
@@ -1,32 +1,63 @@
-import os
-from supabase import create_client, Client
-from typing import Optional, Dict, Any, List
-from dotenv import load_dotenv
+from typing import Optional, Dict, Any, List, Tuple
+from app.services.supabase_clients import supabase_clients
+from app.utils.fieldsets import FieldSet
+
+# ?fields= allow-lists for list endpoints
+MARKETPLACE_FIELDS = FieldSet(
+    columns=(
+        "id", "user_id", "neighbourhood_id", "title", "description", "price", "category",
+        "condition", "status", "image_url", "created_at", "updated_at",
+    ),
+    relations={"user": "user:users(id, name, phone, avatar_url)"},
+    # Keyset pagination reads the last row's (created_at, id)
+    always=("id", "created_at"),
+)
+# search_marketplace_items RPC rows: "user" is a JSON column, rank drives the cursor
+MARKETPLACE_SEARCH_FIELDS = FieldSet(
+    columns=MARKETPLACE_FIELDS.columns | {"user", "rank"},
+    always=("id", "rank"),
+)
+BUSINESS_FIELDS = FieldSet(
+    columns=(
+        "id", "user_id", "neighbourhood_id", "name", "description", "category", "phone",
+        "email", "website", "address", "image_url", "latitude", "longitude",
+        "created_at", "updated_at",
+    ),
+    relations={"user": "user:users(id, name, phone, avatar_url)"},
+    always=("id", "created_at"),
+)
+
+def _page(query, limit: int, offset: int = 0, cursor: Optional[List[Any]] = None):
+    """
+    Apply keyset pagination on (created_at DESC, id DESC) when a cursor is given,
+    otherwise the legacy offset range
+    """
+    if cursor:
+        created_at, row_id = cursor
+        # Quoted: timestamps contain characters PostgREST treats as syntax
+        query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})')
+        return query.limit(limit)
+    return query.range(offset, offset + limit - 1)
 
 class SupabaseService:
-    def __init__(self):
-        # Load environment variables
-        load_dotenv()
-        self.url = os.getenv("SUPABASE_URL")
-        self.service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-        
-        if not self.url or not self.service_role_key:
-            # Don't raise error at init - allow lazy initialization
-            self.client = None
-        else:
-            self.client: Client = create_client(self.url, self.service_role_key)
+    """Database access through the shared service-role client"""
+
+    @property
+    def url(self) -> Optional[str]:
+        return supabase_clients.url()
+    
+    @property
+    def service_role_key(self) -> Optional[str]:
+        return supabase_clients.key("service_role")
+    
+    @property
+    def client(self):
+        """Shared service-role client, built on first use"""
+        return supabase_clients.get("service_role")
     
     def _ensure_client(self):
-        """Ensure client is initialized and re-load env vars if needed"""
-        if self.client is None:
-            # Reload environment variables in case they were set after module import
-            load_dotenv()
-            self.url = os.getenv("SUPABASE_URL")
-            self.service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-            
-            if not self.url or not self.service_role_key:
-                raise ValueError("Missing Supabase environment variables. Please set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in your .env file")
-            self.client = create_client(self.url, self.service_role_key)
+        """Ensure client is initialized (raises ValueError if not configured)"""
+        supabase_clients.get("service_role")
     
     async def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user by ID"""
@@ -212,6 +243,36 @@ class SupabaseService:
         result = query.order("name").limit(limit).execute()
         return result.data or []
     
+    async def get_all_neighbourhoods(self, page_size: int = 1000) -> List[Dict[str, Any]]:
+        """Every neighbourhood, fetched in pages (for in-memory lookups)"""
+        self._ensure_client()
+        rows: List[Dict[str, Any]] = []
+        while True:
+            result = (
+                self.client.table("neighbourhoods")
+                .select("*")
+                .order("id")
+                .range(len(rows), len(rows) + page_size - 1)
+                .execute()
+            )
+            page = result.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+    
+    async def get_neighbourhoods_fingerprint(self) -> Tuple[Optional[int], Optional[str]]:
+        """(row count, latest updated_at) of the neighbourhoods table: changes whenever the catalog does"""
+        self._ensure_client()
+        result = (
+            self.client.table("neighbourhoods")
+            .select("updated_at", count="exact")
+            .not_.is_("updated_at", "null")
+            .order("updated_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+        return result.count, result.data[0]["updated_at"] if result.data else None
+    
     async def get_neighbourhood(self, neighbourhood_id: str) -> Optional[Dict[str, Any]]:
         """Get neighbourhood by ID"""
         self._ensure_client()
@@ -231,17 +292,25 @@ class SupabaseService:
         category: Optional[str] = None,
         status: str = "available",
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        select: Optional[str] = None,
+        cursor: Optional[List[Any]] = None
     ) -> List[Dict[str, Any]]:
-        """Get marketplace items with filters"""
+        """
+        Get marketplace items with filters, newest first
+
+        select: compiled MARKETPLACE_FIELDS projection
+        cursor: [created_at, id] of the last row of the previous page (replaces offset)
+        """
         self._ensure_client()
         query = (
             self.client.table("marketplace_items")
-            .select("*, user:users(id, name, phone, avatar_url)")
+            .select(select or "*, user:users(id, name, phone, avatar_url)")
             .eq("status", status)
             .order("created_at", desc=True)
-            .range(offset, offset + limit - 1)
+            .order("id", desc=True)
         )
+        query = _page(query, limit, offset, cursor)
         
         if neighbourhood_id:
             query = query.eq("neighbourhood_id", neighbourhood_id)
@@ -288,31 +357,63 @@ class SupabaseService:
         category: Optional[str] = None,
         min_price: Optional[float] = None,
         max_price: Optional[float] = None,
-        limit: int = 50
+        limit: int = 50,
+        select: Optional[str] = None,
+        cursor: Optional[List[Any]] = None
     ) -> List[Dict[str, Any]]:
-        """Search marketplace items by title and description"""
-        self._ensure_client()
-        search_query = (
-            self.client.table("marketplace_items")
-            .select("*, user:users(id, name, phone)")
-            .or_(f"title.ilike.%{query}%,description.ilike.%{query}%")
-            .eq("status", "available")
-            .order("created_at", desc=True)
-            .limit(limit)
+        """
+        Ranked full-text search over title and description
+        (search_marketplace_items RPC, see database/marketplace_search_migration.sql)
+
+        cursor: [rank, id] of the last row of the previous page
+        """
+        self._ensure_client()
+        search_query = self.client.rpc(
+            "search_marketplace_items",
+            {
+                "search_query": query,
+                "filter_neighbourhood_id": neighbourhood_id,
+                "filter_category": category,
+                "filter_min_price": min_price,
+                "filter_max_price": max_price,
+                "result_limit": limit,
+                "cursor_rank": cursor[0] if cursor else None,
+                "cursor_id": cursor[1] if cursor else None,
+            }
         )
-        
-        if neighbourhood_id:
-            search_query = search_query.eq("neighbourhood_id", neighbourhood_id)
-        if category:
-            search_query = search_query.eq("category", category)
-        if min_price is not None:
-            search_query = search_query.gte("price", min_price)
-        if max_price is not None:
-            search_query = search_query.lte("price", max_price)
+        if select:
+            search_query = search_query.select(select)
         
         result = search_query.execute()
         return result.data or []
 
+    async def get_marketplace_facets(
+        self,
+        neighbourhood_id: Optional[str] = None,
+        category: Optional[str] = None,
+        condition: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        status: str = "available"
+    ) -> Dict[str, Any]:
+        """
+        Category, condition and price-bucket counts from one grouped query
+        (marketplace_facets RPC, see database/marketplace_facets_migration.sql)
+        """
+        self._ensure_client()
+        result = self.client.rpc(
+            "marketplace_facets",
+            {
+                "filter_neighbourhood_id": neighbourhood_id,
+                "filter_category": category,
+                "filter_condition": condition,
+                "filter_min_price": min_price,
+                "filter_max_price": max_price,
+                "filter_status": status,
+            }
+        ).execute()
+        return result.data or {"total": 0, "categories": {}, "conditions": {}, "price_buckets": []}
+
     async def create_business(self, business_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new business listing"""
         self._ensure_client()
@@ -325,16 +426,24 @@ class SupabaseService:
         user_id: Optional[str] = None,
         category: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        select: Optional[str] = None,
+        cursor: Optional[List[Any]] = None
     ) -> List[Dict[str, Any]]:
-        """Get business listings with filters"""
+        """
+        Get business listings with filters, newest first
+
+        select: compiled BUSINESS_FIELDS projection
+        cursor: [created_at, id] of the last row of the previous page (replaces offset)
+        """
         self._ensure_client()
         query = (
             self.client.table("businesses")
-            .select("*, user:users(id, name, phone, avatar_url)")
+            .select(select or "*, user:users(id, name, phone, avatar_url)")
             .order("created_at", desc=True)
-            .range(offset, offset + limit - 1)
+            .order("id", desc=True)
         )
+        query = _page(query, limit, offset, cursor)
         
         if neighbourhood_id:
             query = query.eq("neighbourhood_id", neighbourhood_id)
@@ -346,6 +455,31 @@ class SupabaseService:
         result = query.execute()
         return result.data or []
 
+    async def get_nearby_businesses(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_m: float,
+        category: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Businesses within radius_m of a point, nearest first, with distance_m
+        (nearby_businesses RPC, see database/business_geo_migration.sql)
+        """
+        self._ensure_client()
+        result = self.client.rpc(
+            "nearby_businesses",
+            {
+                "origin_lat": latitude,
+                "origin_lon": longitude,
+                "radius_m": radius_m,
+                "filter_category": category,
+                "result_limit": limit,
+            }
+        ).execute()
+        return result.data or []
+
     async def get_business_by_id(self, business_id: str) -> Optional[Dict[str, Any]]:
         """Get a business listing by ID"""
         self._ensure_client()
@@ -358,6 +492,20 @@ class SupabaseService:
         )
         return result.data if result.data else None
 
+    async def get_businesses_fingerprint(self, neighbourhood_id: str) -> Tuple[Optional[int], Optional[str]]:
+        """(row count, latest updated_at) of a neighbourhood's businesses: changes on any create, edit or delete"""
+        self._ensure_client()
+        result = (
+            self.client.table("businesses")
+            .select("updated_at", count="exact")
+            .eq("neighbourhood_id", neighbourhood_id)
+            .not_.is_("updated_at", "null")
+            .order("updated_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+        return result.count, result.data[0]["updated_at"] if result.data else None
+
     async def update_business(self, business_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update a business listing"""
         self._ensure_client()
@@ -379,13 +527,14 @@ class SupabaseService:
         query: str,
         neighbourhood_id: Optional[str] = None,
         category: Optional[str] = None,
-        limit: int = 50
+        limit: int = 50,
+        select: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Search business listings by name and description"""
         self._ensure_client()
         search_query = (
             self.client.table("businesses")
-            .select("*, user:users(id, name, phone)")
+            .select(select or "*, user:users(id, name, phone)")
             .or_(f"name.ilike.%{query}%,description.ilike.%{query}%")
             .order("created_at", desc=True)
             .limit(limit)
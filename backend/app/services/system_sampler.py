@@ -0,0 +1,108 @@
+"""
+Background system metrics sampler
+Collects process CPU, memory, file descriptors, event-loop lag and GC stats on
+an interval into a ring buffer, so /health/metrics never blocks the event loop.
+"""
+import asyncio
+import gc
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+import psutil
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+class SystemSampler:
+    def __init__(self, interval: float = 5.0, history: int = 120):
+        self.interval = interval
+        self.samples: deque = deque(maxlen=history)
+        self.process = psutil.Process(os.getpid())
+        self._task: Optional[asyncio.Task] = None
+        self._last_lag = 0.0
+
+    def _descriptor_count(self) -> int:
+        # num_fds is POSIX-only; Windows exposes handles instead
+        if hasattr(self.process, "num_fds"):
+            return self.process.num_fds()
+        return self.process.num_handles()
+
+    def _collect(self) -> Dict[str, Any]:
+        """Read process stats (runs in a worker thread; psutil reads /proc)"""
+        with self.process.oneshot():
+            return {
+                # Non-blocking: CPU usage since the previous call
+                "cpu_percent": self.process.cpu_percent(interval=None),
+                "memory_mb": round(self.process.memory_info().rss / 1024 / 1024, 2),
+                "threads": self.process.num_threads(),
+                "open_files": self._descriptor_count(),
+            }
+
+    def _gc_stats(self) -> Dict[str, Any]:
+        return {
+            "counts": list(gc.get_count()),
+            "collections": [generation["collections"] for generation in gc.get_stats()],
+            "uncollectable": sum(generation["uncollectable"] for generation in gc.get_stats()),
+        }
+
+    async def sample(self) -> Dict[str, Any]:
+        """Take one sample and append it to the ring buffer"""
+        sample = await asyncio.to_thread(self._collect)
+        sample["timestamp"] = time.time()
+        sample["event_loop_lag_ms"] = round(self._last_lag * 1000, 3)
+        sample["gc"] = self._gc_stats()
+        self.samples.append(sample)
+        return sample
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sample()
+            except Exception as e:
+                logger.warning(f"System metrics sample failed: {e}")
+            # Event-loop lag: how late the loop wakes us up relative to the requested sleep
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self._last_lag = max(0.0, time.perf_counter() - expected)
+
+    def start(self):
+        """Start the sampler task (application startup)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the sampler task (application shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _trend(self, key: str) -> Dict[str, float]:
+        values = [sample[key] for sample in self.samples]
+        return {
+            "min": min(values),
+            "avg": round(sum(values) / len(values), 3),
+            "max": max(values),
+        }
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Latest sample plus min/avg/max over the buffered window"""
+        if not self.samples:
+            return None
+        return {
+            **self.samples[-1],
+            "sample_interval_seconds": self.interval,
+            "window_seconds": round(self.interval * len(self.samples), 1),
+            "trend": {
+                key: self._trend(key)
+                for key in ("cpu_percent", "memory_mb", "open_files", "event_loop_lag_ms")
+            },
+        }
+
+# Singleton instance; started in the app lifespan
+system_sampler = SystemSampler(interval=get_settings().system_metrics_interval)
@@ -0,0 +1,93 @@
+"""
+Content-Encoding negotiation and compressors (gzip, brotli)
+Shared by CompressionMiddleware and the precompressed response cache.
+"""
+import zlib
+from typing import Dict, Iterable, Optional
+
+# brotli is optional; without it only gzip is offered
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Server preference when the client accepts several with equal weight
+SUPPORTED_ENCODINGS = ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.startswith(COMPRESSIBLE_TYPES)
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Accept-Encoding -> {coding: q}"""
+    weights: Dict[str, float] = {}
+    if not header:
+        return weights
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+    return weights
+
+def negotiate(header: Optional[str], available: Iterable[str] = SUPPORTED_ENCODINGS) -> Optional[str]:
+    """Pick the best encoding the client accepts (None means send identity)"""
+    weights = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """
+    One-shot compression
+
+    Args:
+        level: gzip level (1-9) or brotli quality (0-11); defaults favour
+            ratio over speed since one-shot bodies are usually cached
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if level is None else level)
+    if encoding == "gzip":
+        compressor = zlib.compressobj(9 if level is None else level, zlib.DEFLATED, 31)
+        return compressor.compress(body) + compressor.flush()
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+class StreamCompressor:
+    """Incremental compressor for streamed bodies; each chunk is flushed so it reaches the client"""
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=level)
+        elif encoding == "gzip":
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31)
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def process(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(chunk) + self._brotli.flush()
+        return self._zlib.compress(chunk) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush()
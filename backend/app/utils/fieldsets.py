@@ -0,0 +1,73 @@
+"""
+Sparse fieldsets (?fields=) for list endpoints
+Requested field names are checked against an allow-list and compiled into a
+PostgREST select string, so unused columns never leave the database.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+from fastapi import HTTPException, status
+
+class FieldSet:
+    """
+    Allow-list of columns and embedded relations a list endpoint may return
+
+    Args:
+        columns: Plain table columns clients may ask for
+        relations: Field name -> PostgREST embed, e.g. {"user": "user:users(id, name)"}
+        always: Columns included in every projection (row identity, cursors)
+    """
+    def __init__(
+        self,
+        columns: Iterable[str],
+        relations: Optional[Dict[str, str]] = None,
+        always: Iterable[str] = ("id",)
+    ):
+        self.columns = frozenset(columns)
+        self.relations = relations or {}
+        self.always = tuple(always)
+
+    @property
+    def allowed(self) -> List[str]:
+        return sorted(self.columns | set(self.relations))
+
+    def parse(self, fields: Optional[str]) -> Optional[List[str]]:
+        """
+        Split and validate a ?fields= value
+
+        Returns:
+            Requested field names in order without duplicates, or None if not given
+
+        Raises:
+            HTTPException: 400 if a field is not in the allow-list
+        """
+        if fields is None or not fields.strip():
+            return None
+        requested: List[str] = []
+        for name in fields.split(","):
+            name = name.strip()
+            if name and name not in requested:
+                requested.append(name)
+        unknown = [name for name in requested if name not in self.columns and name not in self.relations]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. Allowed fields: {', '.join(self.allowed)}"
+            )
+        return requested
+
+    def select(self, fields: Optional[str]) -> Optional[str]:
+        """Compile ?fields= into a select string (None keeps the query's default select)"""
+        requested = self.parse(fields)
+        if requested is None:
+            return None
+        parts = [name for name in self.always if name not in requested]
+        for name in requested:
+            parts.append(self.relations.get(name, name))
+        return ", ".join(parts)
+
+    def project(self, rows: List[Dict[str, Any]], fields: Optional[str]) -> List[Dict[str, Any]]:
+        """Apply ?fields= to rows already in memory (rows are returned as-is if not given)"""
+        requested = self.parse(fields)
+        if requested is None:
+            return rows
+        names = [name for name in self.always if name not in requested] + requested
+        return [{name: row.get(name) for name in names} for row in rows]
@@ -0,0 +1,150 @@
+"""
+Small geometry helpers for neighbourhood lookups
+Coordinates are (longitude, latitude) in degrees, as in GeoJSON.
+"""
+import heapq
+import itertools
+import math
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+EARTH_RADIUS_M = 6371008.8
+METRES_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+BBox = Tuple[float, float, float, float]  # min_lon, min_lat, max_lon, max_lat
+Ring = Sequence[Sequence[float]]
+
+def haversine_m(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """Great-circle distance in metres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+def ring_bbox(ring: Ring) -> BBox:
+    lons = [point[0] for point in ring]
+    lats = [point[1] for point in ring]
+    return min(lons), min(lats), max(lons), max(lats)
+
+def point_in_polygon(lon: float, lat: float, rings: Sequence[Ring]) -> bool:
+    """
+    Even-odd ray casting over a polygon's rings (outer ring first, then holes)
+
+    A point inside a hole crosses the outer ring and the hole, so it counts
+    as outside without treating holes separately.
+    """
+    inside = False
+    for ring in rings:
+        count = len(ring)
+        j = count - 1
+        for i in range(count):
+            xi, yi = ring[i][0], ring[i][1]
+            xj, yj = ring[j][0], ring[j][1]
+            if (yi > lat) != (yj > lat) and lon < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+                inside = not inside
+            j = i
+    return inside
+
+def bbox_distance_m(lon: float, lat: float, bbox: BBox) -> float:
+    """
+    Approximate distance from a point to a bounding box (0 inside it)
+
+    Equirectangular at the point's latitude: cheap and close enough to order
+    the search in RTree.nearest, which ranks candidates by exact distance.
+    """
+    dx = max(bbox[0] - lon, 0.0, lon - bbox[2]) * math.cos(math.radians(lat))
+    dy = max(bbox[1] - lat, 0.0, lat - bbox[3])
+    return math.hypot(dx, dy) * METRES_PER_DEGREE
+
+def _union(boxes: Iterable[BBox]) -> BBox:
+    min_lons, min_lats, max_lons, max_lats = zip(*boxes)
+    return min(min_lons), min(min_lats), max(max_lons), max(max_lats)
+
+class _Node:
+    __slots__ = ("bbox", "children", "leaf")
+
+    def __init__(self, bbox: BBox, children: List[Any], leaf: bool):
+        self.bbox = bbox
+        self.children = children  # (bbox, item) pairs in leaves, _Nodes otherwise
+        self.leaf = leaf
+
+class RTree:
+    """
+    Static R-tree bulk-loaded with Sort-Tile-Recursive packing
+
+    Built once from (bbox, item) pairs; rebuild it to change the contents.
+    """
+    def __init__(self, entries: Iterable[Tuple[BBox, Any]], node_capacity: int = 16):
+        self.node_capacity = node_capacity
+        entries = list(entries)
+        self.size = len(entries)
+        self.root: Optional[_Node] = None
+        if not entries:
+            return
+        level = self._pack(entries, leaf=True)
+        while len(level) > 1:
+            level = self._pack([(node.bbox, node) for node in level], leaf=False)
+        self.root = level[0]
+
+    def _pack(self, entries: List[Tuple[BBox, Any]], leaf: bool) -> List[_Node]:
+        capacity = self.node_capacity
+        node_count = math.ceil(len(entries) / capacity)
+        slab_size = capacity * math.ceil(math.sqrt(node_count))
+        entries.sort(key=lambda entry: entry[0][0] + entry[0][2])
+        nodes = []
+        for start in range(0, len(entries), slab_size):
+            slab = sorted(entries[start:start + slab_size], key=lambda entry: entry[0][1] + entry[0][3])
+            for offset in range(0, len(slab), capacity):
+                group = slab[offset:offset + capacity]
+                children = group if leaf else [node for _, node in group]
+                nodes.append(_Node(_union(bbox for bbox, _ in group), children, leaf))
+        return nodes
+
+    def __len__(self) -> int:
+        return self.size
+
+    def containing(self, lon: float, lat: float) -> Iterator[Any]:
+        """Items whose bounding box contains the point"""
+        if self.root is None:
+            return
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.leaf:
+                for bbox, item in node.children:
+                    if bbox[0] <= lon <= bbox[2] and bbox[1] <= lat <= bbox[3]:
+                        yield item
+            else:
+                for child in node.children:
+                    bbox = child.bbox
+                    if bbox[0] <= lon <= bbox[2] and bbox[1] <= lat <= bbox[3]:
+                        stack.append(child)
+
+    def nearest(
+        self,
+        lon: float,
+        lat: float,
+        distance: Callable[[Any], float]
+    ) -> Optional[Tuple[Any, float]]:
+        """
+        Best-first search for the item with the smallest distance(item)
+
+        Nodes are expanded in order of their distance to the point
+        (bbox_distance_m), so the first item popped is the nearest one, up to
+        the equirectangular approximation of node distances.
+        """
+        if self.root is None:
+            return None
+        counter = itertools.count()
+        heap: List[Tuple[float, int, bool, Any]] = [(0.0, next(counter), False, self.root)]
+        while heap:
+            key, _, is_item, value = heapq.heappop(heap)
+            if is_item:
+                return value, key
+            if value.leaf:
+                for _, item in value.children:
+                    heapq.heappush(heap, (distance(item), next(counter), True, item))
+            else:
+                for child in value.children:
+                    heapq.heappush(heap, (bbox_distance_m(lon, lat, child.bbox), next(counter), False, child))
+        return None
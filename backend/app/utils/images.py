@@ -0,0 +1,115 @@
+"""
+Image format detection and responsive derivative rendering
+The client's Content-Type and filename are never trusted for uploads; the
+stored content type and extension come from the file's leading bytes.
+render_derivatives runs in the image derivative process pool, so this
+module stays importable without the rest of the app.
+"""
+import io
+from typing import List, Optional, Sequence, Tuple
+
+# Pillow is optional; without it uploads are stored without derivatives
+try:
+    from PIL import Image, ImageOps, features
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Enough leading bytes to tell every supported format apart
+SNIFF_BYTES = 12
+
+# Derivative format -> (Pillow encoder, content type)
+DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "avif": ("AVIF", "image/avif"),
+}
+
+def sniff_image_type(head: bytes) -> Optional[Tuple[str, str]]:
+    """
+    (content type, extension) for a supported image, from its first bytes
+
+    Returns:
+        ("image/jpeg", "jpg"), ("image/png", "png"), ("image/gif", "gif"),
+        ("image/webp", "webp"), or None for anything else
+    """
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg", "jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png", "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif", "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp", "webp"
+    return None
+
+def parse_widths(value: str) -> List[int]:
+    """IMAGE_DERIVATIVE_WIDTHS ("320,640,1080") as sorted pixel widths"""
+    return sorted({int(part) for part in value.split(",") if part.strip()})
+
+def parse_formats(value: str) -> List[str]:
+    """IMAGE_DERIVATIVE_FORMATS ("webp,avif") as known format names"""
+    return [name for name in (part.strip().lower() for part in value.split(",")) if name in DERIVATIVE_FORMATS]
+
+def derivative_path(path: str, width: int, extension: str) -> str:
+    """Storage path of a derivative, next to its original: posts/u/abc.jpg -> posts/u/abc_w640.webp"""
+    stem = path.rsplit(".", 1)[0] if "." in path.rsplit("/", 1)[-1] else path
+    return f"{stem}_w{width}.{extension}"
+
+def supported_formats(formats: Sequence[str]) -> List[str]:
+    """The requested derivative formats this Pillow build can encode"""
+    if not PIL_AVAILABLE:
+        return []
+    return [name for name in formats if name in DERIVATIVE_FORMATS and features.check(name)]
+
+def render_derivatives(
+    source_path: str,
+    widths: Sequence[int],
+    formats: Sequence[str],
+    quality: int
+) -> Tuple[int, int, List[Tuple[int, int, str, bytes]]]:
+    """
+    Decode an image once and encode it at each width in each format
+
+    Widths above the original's are skipped (no upscaling); an image
+    narrower than every width gets a single copy at its own width, named
+    after the smallest configured width so delete_image finds it.
+    Orientation is applied to the pixels, then EXIF/XMP metadata is
+    dropped; only the ICC profile is kept. Animated images use the first frame.
+
+    Returns:
+        (original width, original height,
+         [(width in the file name, actual pixel width, format, encoded bytes)])
+    """
+    with Image.open(source_path) as source:
+        # JPEG only: decode at a reduced DCT scale that still covers the largest width
+        largest = max(widths)
+        source.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(source)
+        icc_profile = source.info.get("icc_profile")
+
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    image.info = {}
+    original_width, original_height = image.size
+
+    targets = [(width, width) for width in sorted(set(widths)) if width < original_width]
+    if not targets:
+        targets = [(min(widths), original_width)]
+    rendered = []
+    for label, width in targets:
+        height = max(1, round(original_height * width / original_width))
+        resized = image if width == original_width else image.resize(
+            (width, height), Image.Resampling.LANCZOS, reducing_gap=3.0
+        )
+        for name in formats:
+            encoder, _ = DERIVATIVE_FORMATS[name]
+            buffer = io.BytesIO()
+            options = {"quality": quality}
+            if icc_profile:
+                options["icc_profile"] = icc_profile
+            if name == "avif":
+                # Default speed 6 is several times slower for a barely smaller file
+                options["speed"] = 8
+            resized.save(buffer, encoder, **options)
+            rendered.append((label, width, name, buffer.getvalue()))
+    return original_width, original_height, rendered
@@ -0,0 +1,271 @@
+"""
+In-process request metrics with Prometheus text exposition
+
+Histograms and gauges are plain dicts updated from the event loop thread, so
+recording takes no locks; observations made on other threads (Supabase
+queries run by the auth executor) are handed back to the loop. With several workers, set METRICS_MULTIPROC_DIR to a
+directory shared by all of them: each worker periodically writes its snapshot
+there and /metrics merges every worker's file.
+"""
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+import psutil
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+LabelKey = Tuple[str, ...]
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self.series: Dict[LabelKey, list] = {}
+
+    def observe(self, labels: LabelKey, value: float):
+        series = self.series.get(labels)
+        if series is None:
+            series = [[0] * (len(self.buckets) + 1), 0.0]
+            self.series[labels] = series
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def snapshot(self) -> dict:
+        return {"|".join(labels): [counts[:], total] for labels, (counts, total) in self.series.items()}
+
+class Gauge:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.series: Dict[LabelKey, float] = {}
+
+    def inc(self, labels: LabelKey, amount: float = 1):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def dec(self, labels: LabelKey, amount: float = 1):
+        self.series[labels] = self.series.get(labels, 0) - amount
+
+    def snapshot(self) -> dict:
+        return {"|".join(labels): value for labels, value in self.series.items()}
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_bound(bound: float) -> str:
+    return str(float(bound)) if isinstance(bound, float) else str(bound)
+
+class RequestMetrics:
+    def __init__(self, multiproc_dir: Optional[str] = None, flush_interval: float = 5.0):
+        self.multiproc_dir = multiproc_dir
+        self.flush_interval = flush_interval
+        self.duration = Histogram(
+            "http_request_duration_seconds",
+            "Request latency by route template, method and status class",
+            ("route", "method", "status"),
+            LATENCY_BUCKETS,
+        )
+        self.request_size = Histogram(
+            "http_request_size_bytes",
+            "Request body size by route template and method",
+            ("route", "method"),
+            SIZE_BUCKETS,
+        )
+        self.response_size = Histogram(
+            "http_response_size_bytes",
+            "Response body size by route template, method and status class",
+            ("route", "method", "status"),
+            SIZE_BUCKETS,
+        )
+        self.db_duration = Histogram(
+            "db_query_duration_seconds",
+            "Supabase query latency by table and operation",
+            ("table", "operation"),
+            LATENCY_BUCKETS,
+        )
+        self.in_flight = Gauge(
+            "http_requests_in_flight",
+            "Requests currently being handled",
+            ("method",),
+        )
+        self.histograms = (self.duration, self.request_size, self.response_size, self.db_duration)
+        self.gauges = (self.in_flight,)
+        # The loop that owns the dicts; set by the first request
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def request_started(self, method: str):
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.get_running_loop()
+        self.in_flight.inc((method,))
+
+    def request_finished(
+        self,
+        route: str,
+        method: str,
+        status_code: int,
+        duration: float,
+        request_bytes: int,
+        response_bytes: int
+    ):
+        """Record a completed request (call once per request_started)"""
+        status_class = f"{status_code // 100}xx"
+        self.in_flight.dec((method,))
+        self.duration.observe((route, method, status_class), duration)
+        self.request_size.observe((route, method), request_bytes)
+        self.response_size.observe((route, method, status_class), response_bytes)
+
+    def db_query_finished(self, table: str, operation: str, duration: float):
+        """Record a Supabase query; safe to call from worker threads"""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                on_loop = asyncio.get_running_loop() is loop
+            except RuntimeError:
+                on_loop = False
+            if not on_loop:
+                try:
+                    loop.call_soon_threadsafe(self.db_duration.observe, (table, operation), duration)
+                except RuntimeError:
+                    # Loop closed during shutdown; the observation no longer matters
+                    pass
+                return
+        self.db_duration.observe((table, operation), duration)
+
+    # Multi-worker support
+
+    def snapshot(self) -> dict:
+        return {
+            "histograms": {h.name: h.snapshot() for h in self.histograms},
+            "gauges": {g.name: g.snapshot() for g in self.gauges},
+        }
+
+    def _snapshot_path(self) -> str:
+        return os.path.join(self.multiproc_dir, f"worker-{os.getpid()}.json")
+
+    def flush(self, snapshot: Optional[dict] = None):
+        """
+        Atomically write this worker's snapshot to the shared directory
+
+        Pass a snapshot taken on the event loop when calling from another
+        thread; the live dicts are only safe to read from the loop.
+        """
+        if not self.multiproc_dir:
+            return
+        if snapshot is None:
+            snapshot = self.snapshot()
+        os.makedirs(self.multiproc_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.multiproc_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self._snapshot_path())
+
+    def remove_snapshot(self):
+        """Delete this worker's file (startup, in case the PID was reused, and shutdown)"""
+        if not self.multiproc_dir:
+            return
+        try:
+            os.remove(self._snapshot_path())
+        except FileNotFoundError:
+            pass
+
+    async def run_flusher(self):
+        """Background task that periodically publishes this worker's snapshot"""
+        await asyncio.to_thread(self.remove_snapshot)
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await asyncio.to_thread(self.flush, self.snapshot())
+            except OSError as e:
+                logger.warning(f"Failed to flush metrics snapshot: {e}")
+
+    def _collect(self, local: dict) -> List[dict]:
+        if not self.multiproc_dir:
+            return [local]
+        self.flush(local)
+        snapshots = []
+        for name in os.listdir(self.multiproc_dir):
+            if not (name.startswith("worker-") and name.endswith(".json")):
+                continue
+            pid = name[len("worker-"):-len(".json")]
+            if pid.isdigit() and not psutil.pid_exists(int(pid)):
+                # A dead or restarted worker: its in-flight gauge and counters no longer apply
+                try:
+                    os.remove(os.path.join(self.multiproc_dir, name))
+                except OSError:
+                    pass
+                continue
+            try:
+                with open(os.path.join(self.multiproc_dir, name)) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                # Partially written or removed between listdir and open
+                continue
+        return snapshots
+
+    # Prometheus exposition
+
+    def render(self, local: Optional[dict] = None) -> str:
+        """
+        Render all metrics (merged across workers) in Prometheus text format
+
+        Reads every worker's file in multi-worker mode, so run it in a thread
+        with a snapshot taken on the event loop (see /metrics).
+        """
+        snapshots = self._collect(local if local is not None else self.snapshot())
+        lines: List[str] = []
+
+        for histogram in self.histograms:
+            merged: Dict[str, list] = {}
+            for snapshot in snapshots:
+                for key, (counts, total) in snapshot["histograms"].get(histogram.name, {}).items():
+                    entry = merged.setdefault(key, [[0] * len(counts), 0.0])
+                    entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                    entry[1] += total
+
+            lines.append(f"# HELP {histogram.name} {histogram.help_text}")
+            lines.append(f"# TYPE {histogram.name} histogram")
+            for key in sorted(merged):
+                counts, total = merged[key]
+                values = key.split("|")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, counts):
+                    cumulative += count
+                    labels = _format_labels(histogram.label_names, values, ("le", _format_bound(bound)))
+                    lines.append(f"{histogram.name}_bucket{labels} {cumulative}")
+                cumulative += counts[-1]
+                labels = _format_labels(histogram.label_names, values, ("le", "+Inf"))
+                lines.append(f"{histogram.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(histogram.label_names, values)
+                lines.append(f"{histogram.name}_sum{labels} {total}")
+                lines.append(f"{histogram.name}_count{labels} {cumulative}")
+
+        for gauge in self.gauges:
+            merged_gauge: Dict[str, float] = {}
+            for snapshot in snapshots:
+                for key, value in snapshot["gauges"].get(gauge.name, {}).items():
+                    merged_gauge[key] = merged_gauge.get(key, 0) + value
+
+            lines.append(f"# HELP {gauge.name} {gauge.help_text}")
+            lines.append(f"# TYPE {gauge.name} gauge")
+            for key in sorted(merged_gauge):
+                labels = _format_labels(gauge.label_names, key.split("|"))
+                lines.append(f"{gauge.name}{labels} {merged_gauge[key]}")
+
+        return "\n".join(lines) + "\n"
+
+# Singleton instance
+request_metrics = RequestMetrics(multiproc_dir=get_settings().metrics_multiproc_dir or None)
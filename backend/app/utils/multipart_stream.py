@@ -0,0 +1,107 @@
+"""
+Streaming multipart/form-data reader
+Yields one file field's bytes as they arrive instead of spooling the whole
+form first (Starlette's request.form()), so handlers can validate and
+forward an upload chunk by chunk and stop reading as soon as it fails.
+"""
+from typing import AsyncIterator, List, Optional
+from fastapi import HTTPException, Request, status
+
+try:
+    from python_multipart import MultipartParser
+    from python_multipart.multipart import parse_options_header
+except ImportError:
+    # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+class MultipartFileStream:
+    """
+    Parser state for a single file field of a multipart request body
+
+    Iterate it to receive the field's data; the rest of the body is read
+    only as far as needed to reach the end of that field.
+    """
+    def __init__(self, request: Request, field_name: str = "file"):
+        self.request = request
+        self.field_name = field_name
+        self.filename: Optional[str] = None
+        self.found = False
+        self._in_field = False
+        self._done = False
+        self._pending: List[bytes] = []
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+
+    def _on_part_begin(self):
+        self._disposition = b""
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        self._in_field = not self.found and name == self.field_name and b"filename" in options
+        if self._in_field:
+            self.found = True
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_field:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self):
+        if self._in_field:
+            self._in_field = False
+            self._done = True
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        _, params = parse_options_header(self.request.headers.get("content-type", ""))
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a multipart/form-data body"
+            )
+        parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+        async for chunk in self.request.stream():
+            try:
+                parser.write(chunk)
+            except Exception as e:
+                # python-multipart raises its own error types (and ValueError) on malformed bodies
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Malformed multipart body: {e}"
+                )
+            pending, self._pending = self._pending, []
+            for data in pending:
+                yield data
+            if self._done:
+                return
+        if not self.found:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Missing file field '{self.field_name}'"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload ended before the file was complete"
+        )
@@ -0,0 +1,90 @@
+"""
+Opaque cursors for keyset pagination
+A cursor is the sort key of the last row on a page, encoded as URL-safe
+base64 JSON. Clients pass it back unchanged to get the next page.
+"""
+import base64
+import binascii
+import json
+import math
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import HTTPException, Response, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[List[Any]]:
+    """
+    Decode a cursor into its sort-key values
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed or has the wrong number of values
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+def decode_created_cursor(cursor: Optional[str]) -> Optional[List[str]]:
+    """
+    Decode a (created_at, id) keyset cursor, checking both values since they
+    end up inside a PostgREST filter
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    values = decode_cursor(cursor, 2)
+    if values is None:
+        return None
+    try:
+        created_at = datetime.fromisoformat(str(values[0])).isoformat()
+        row_id = str(uuid.UUID(str(values[1])))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return [created_at, row_id]
+
+def decode_rank_cursor(cursor: Optional[str]) -> Optional[List[Any]]:
+    """
+    Decode a (rank, id) search cursor, checking both values since they are
+    passed to the search RPC as typed arguments
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    values = decode_cursor(cursor, 2)
+    if values is None:
+        return None
+    try:
+        if isinstance(values[0], bool):
+            raise ValueError("rank must be a number")
+        rank = float(values[0])
+        if not math.isfinite(rank):
+            raise ValueError("rank must be finite")
+        row_id = str(uuid.UUID(str(values[1])))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return [rank, row_id]
+
+def created_cursor(rows: List[dict], limit: int) -> Optional[str]:
+    """Cursor for the page after rows, or None if this was the last page"""
+    if len(rows) < limit:
+        return None
+    return encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+def set_next_cursor(result: Any, response: Response, cursor: Optional[str]) -> Any:
+    """Attach X-Next-Cursor to what the endpoint returns (a Response, or content rendered via response)"""
+    if cursor:
+        target = result if isinstance(result, Response) else response
+        target.headers[NEXT_CURSOR_HEADER] = cursor
+    return result
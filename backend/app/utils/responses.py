@@ -0,0 +1,63 @@
+"""
+JSON response classes
+orjson-backed default response class, plus a trusted fast path for list
+endpoints whose rows are already shaped by the service layer.
+"""
+from typing import Any, Dict, Iterable, List, Type
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+from app.config import get_settings
+
+# orjson is optional; fall back to the stdlib encoder
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+DefaultJSONResponse = ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
+
+class RowProjection:
+    """
+    Projects rows onto a response model's fields without validating them
+
+    Keeps the response contract (same keys, same defaults for missing keys,
+    extra columns dropped) while skipping pydantic's per-field validation.
+    """
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.defaults: Dict[str, Any] = {}
+        for name, field in model.model_fields.items():
+            default = field.get_default(call_default_factory=True)
+            # Required fields missing from a trusted row serialize as null
+            self.defaults[name] = None if default is PydanticUndefined else default
+
+    def project_all(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        defaults = self.defaults.items()
+        return [{name: row.get(name, default) for name, default in defaults} for row in rows]
+
+_projections: Dict[Type[BaseModel], RowProjection] = {}
+
+def project_rows(rows: Iterable[Dict[str, Any]], model: Type[BaseModel]) -> List[Dict[str, Any]]:
+    """Project rows onto model's fields with a cached RowProjection"""
+    projection = _projections.get(model)
+    if projection is None:
+        projection = _projections[model] = RowProjection(model)
+    return projection.project_all(rows)
+
+def trusted_response(rows: List[Dict[str, Any]], model: Type[BaseModel], sparse: bool = False):
+    """
+    Serialize service-layer rows directly, skipping response_model validation
+
+    Opt-in per endpoint, for rows built from known select lists. Returns the
+    rows unchanged (so FastAPI validates them as usual) when TRUSTED_RESPONSES
+    is disabled. Sparse rows (?fields=) only carry the requested columns and
+    are always serialized as-is.
+    """
+    if sparse:
+        return DefaultJSONResponse(rows)
+    if not get_settings().trusted_responses:
+        return rows
+    return DefaultJSONResponse(project_rows(rows, model))
@@ -0,0 +1,73 @@
+"""
+Cold-start import profile
+
+Imports the application in fresh interpreters with -X importtime, reports the
+slowest modules and fails (exit code 1) if the best-of-N import time is over
+the budget or if a Supabase client library was imported eagerly. Suitable as
+a CI gate.
+
+Usage (from backend/):
+    python -m benchmarks.cold_start [--runs 3] [--budget-ms 2000]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Built lazily by app.services.supabase_clients; must not load at import time
+LAZY_MODULES = ("supabase", "postgrest", "gotrue", "storage3", "realtime")
+
+PROBE = (
+    "import sys, main; "
+    "print(','.join(m for m in {lazy!r} if m in sys.modules))"
+)
+
+def profile_once() -> tuple:
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(lazy=LAZY_MODULES)],
+        cwd=backend_dir,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nesting is shown by indentation of the module name
+        modules.append((int(cumulative_us), name.rstrip()))
+    total_us = next(cumulative for cumulative, name in modules if name.strip() == "main")
+    eager = [name for name in result.stdout.strip().split(",") if name]
+    return total_us, modules, eager
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import profile")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("COLD_START_BUDGET_MS", "2000")))
+    args = parser.parse_args()
+
+    runs = [profile_once() for _ in range(args.runs)]
+    total_us, modules, eager = min(runs, key=lambda run: run[0])
+
+    print(f"import main: {total_us / 1000:.1f} ms (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    print("slowest imports made directly by main:")
+    top_level = sorted(
+        ((cumulative, name.strip()) for cumulative, name in modules if name.startswith("   ") and not name.startswith("    ")),
+        reverse=True
+    )
+    for cumulative, name in top_level[:10]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+    if total_us / 1000 > args.budget_ms:
+        print("FAIL: cold start over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Middleware overhead benchmark
+
+Compares the per-request cost of the old three-layer BaseHTTPMiddleware stack
+(error handler + request logger + rate limiter) with the fused pure-ASGI
+RequestPipelineMiddleware. Requests are driven straight through the ASGI
+interface so no socket or HTTP parsing cost is included.
+
+Usage (from backend/):
+    python -m benchmarks.middleware_overhead [--requests 20000]
+"""
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.middleware.rate_limit import RateLimiter
+from app.middleware.request_pipeline import RequestPipelineMiddleware
+
+class LegacyErrorHandler(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        request_id = str(uuid.uuid4())[:8]
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+class LegacyRequestLogger(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        response.headers["X-Process-Time"] = f"{time.time() - start_time:.3f}"
+        return response
+
+class LegacyRateLimit(BaseHTTPMiddleware):
+    def __init__(self, app, limiter: RateLimiter):
+        super().__init__(app)
+        self.limiter = limiter
+
+    async def dispatch(self, request, call_next):
+        current_time = time.time()
+        client_id = request.client.host if request.client else "unknown"
+        self.limiter.is_rate_limited(client_id, current_time)
+        response = await call_next(request)
+        for name, value in self.limiter.limit_headers(client_id, current_time).items():
+            response.headers[name] = value
+        return response
+
+def build_app(variant: str, requests: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    limiter = RateLimiter(requests_per_minute=requests * 2)
+    if variant == "legacy":
+        app.add_middleware(LegacyRateLimit, limiter=limiter)
+        app.add_middleware(LegacyRequestLogger)
+        app.add_middleware(LegacyErrorHandler)
+    elif variant == "pipeline":
+        app.add_middleware(RequestPipelineMiddleware, rate_limiter=limiter)
+    return app
+
+async def drive(app: FastAPI, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    # Warm up routing and middleware stack construction
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    # Measure middleware work, not log I/O
+    logging.disable(logging.INFO)
+
+    results = {}
+    for variant in ("bare", "legacy", "pipeline"):
+        per_request = asyncio.run(drive(build_app(variant, args.requests), args.requests))
+        results[variant] = per_request
+        print(f"{variant:>9}: {per_request * 1e6:8.1f} us/request")
+
+    legacy_overhead = results["legacy"] - results["bare"]
+    pipeline_overhead = results["pipeline"] - results["bare"]
+    print(f"\nmiddleware overhead: legacy {legacy_overhead * 1e6:.1f} us, "
+          f"pipeline {pipeline_overhead * 1e6:.1f} us, "
+          f"saved {(legacy_overhead - pipeline_overhead) * 1e6:.1f} us/request")
+
+if __name__ == "__main__":
+    main()
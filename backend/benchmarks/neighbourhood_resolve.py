@@ -0,0 +1,98 @@
+"""
+Neighbourhood resolver lookup latency
+
+Builds a synthetic city of grid-shaped neighbourhood polygons (each edge
+subdivided so every polygon has --vertices points), loads it into
+NeighbourhoodResolver and times lookups for points inside a polygon and
+points outside the covered area (nearest-centroid fallback). A linear scan
+over every polygon is timed as the baseline.
+
+Usage (from backend/):
+    python -m benchmarks.neighbourhood_resolve [--neighbourhoods 2500] [--vertices 200] [--lookups 5000]
+"""
+import argparse
+import math
+import random
+import time
+from typing import Callable, List, Tuple
+from app.services.neighbourhood_resolver import NeighbourhoodResolver
+from app.utils.geo import point_in_polygon
+
+# Roughly Gauteng
+ORIGIN = (27.6, -26.6)
+EXTENT_DEGREES = 1.2
+
+def make_city(count: int, vertices: int) -> Tuple[list, list]:
+    side = math.ceil(math.sqrt(count))
+    cell = EXTENT_DEGREES / side
+    per_edge = max(1, vertices // 4)
+    rows, boundaries = [], []
+    for index in range(count):
+        x0 = ORIGIN[0] + (index % side) * cell
+        y0 = ORIGIN[1] + (index // side) * cell
+        corners = [(x0, y0), (x0 + cell, y0), (x0 + cell, y0 + cell), (x0, y0 + cell)]
+        ring = []
+        for corner, next_corner in zip(corners, corners[1:] + corners[:1]):
+            for step in range(per_edge):
+                t = step / per_edge
+                ring.append((corner[0] + (next_corner[0] - corner[0]) * t, corner[1] + (next_corner[1] - corner[1]) * t))
+        ring.append(ring[0])
+        neighbourhood_id = f"hood-{index}"
+        rows.append({
+            "id": neighbourhood_id,
+            "name": f"Neighbourhood {index}",
+            "latitude": y0 + cell / 2,
+            "longitude": x0 + cell / 2,
+        })
+        boundaries.append((neighbourhood_id, [ring]))
+    return rows, boundaries
+
+def time_lookups(lookup: Callable[[float, float], object], points: List[Tuple[float, float]]) -> Tuple[float, float]:
+    latencies = []
+    for lat, lon in points:
+        start = time.perf_counter()
+        lookup(lat, lon)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies[len(latencies) // 2] * 1e6, latencies[int(len(latencies) * 0.99)] * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Neighbourhood resolver lookup latency")
+    parser.add_argument("--neighbourhoods", type=int, default=2500)
+    parser.add_argument("--vertices", type=int, default=200, help="vertices per polygon")
+    parser.add_argument("--lookups", type=int, default=5000)
+    args = parser.parse_args()
+
+    rows, boundaries = make_city(args.neighbourhoods, args.vertices)
+    resolver = NeighbourhoodResolver()
+    start = time.perf_counter()
+    resolver.replace(rows, boundaries)
+    print(f"Indexed {len(boundaries)} polygons x {args.vertices} vertices in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    rng = random.Random(42)
+    inside = [
+        (ORIGIN[1] + rng.random() * EXTENT_DEGREES, ORIGIN[0] + rng.random() * EXTENT_DEGREES)
+        for _ in range(args.lookups)
+    ]
+    outside = [
+        (ORIGIN[1] - 0.05 - rng.random() * 0.5, ORIGIN[0] + rng.random() * EXTENT_DEGREES)
+        for _ in range(args.lookups)
+    ]
+
+    def linear_scan(lat: float, lon: float):
+        for neighbourhood_id, rings in boundaries:
+            if point_in_polygon(lon, lat, rings):
+                return neighbourhood_id
+        return None
+
+    print(f"{'lookup':<28} {'p50 us':>9} {'p99 us':>9}")
+    for label, lookup, points in (
+        ("R-tree, inside a polygon", resolver.lookup, inside),
+        ("R-tree, nearest centroid", resolver.lookup, outside),
+        ("linear scan, inside", linear_scan, inside[: max(1, args.lookups // 50)]),
+    ):
+        p50, p99 = time_lookups(lookup, points)
+        print(f"{label:<28} {p50:>9.1f} {p99:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+List response serialization benchmark
+
+Times one GET of a 50-row and a 500-row marketplace page through FastAPI,
+driven straight through the ASGI interface, for three response paths:
+
+    stdlib   response_model validation + stdlib JSONResponse (previous default)
+    orjson   response_model validation + ORJSONResponse (current default)
+    trusted  trusted_response(): field projection + ORJSONResponse, no validation
+
+Usage (from backend/):
+    python -m benchmarks.serialization [--iterations 200]
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from app.api.v1.marketplace import MarketplaceItemResponse
+from app.utils.responses import DefaultJSONResponse, trusted_response
+
+def make_rows(count: int) -> List[dict]:
+    return [
+        {
+            "id": f"00000000-0000-0000-0000-{index:012d}",
+            "user_id": "11111111-1111-1111-1111-111111111111",
+            "neighbourhood_id": "22222222-2222-2222-2222-222222222222",
+            "title": f"Item {index}",
+            "description": "Lightly used, collection only. " * 4,
+            "price": 150.0 + index,
+            "category": "furniture",
+            "condition": "used",
+            "status": "available",
+            "image_url": f"https://example.supabase.co/storage/v1/object/public/images/{index}.jpg",
+            "created_at": "2024-01-01T12:00:00+00:00",
+            "updated_at": "2024-01-01T12:00:00+00:00",
+            "user": {"id": "11111111-1111-1111-1111-111111111111", "name": "Thandi", "email": "thandi@example.com"},
+        }
+        for index in range(count)
+    ]
+
+def build_app(rows: List[dict]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/stdlib", response_model=List[MarketplaceItemResponse], response_class=JSONResponse)
+    async def stdlib():
+        return rows
+
+    @app.get("/orjson", response_model=List[MarketplaceItemResponse], response_class=DefaultJSONResponse)
+    async def orjson_path():
+        return rows
+
+    @app.get("/trusted", response_model=List[MarketplaceItemResponse])
+    async def trusted():
+        return trusted_response(rows, MarketplaceItemResponse)
+
+    return app
+
+async def drive(app: FastAPI, path: str, iterations: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(10):
+        await app(dict(scope), receive, send)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / iterations
+
+def main():
+    parser = argparse.ArgumentParser(description="List response serialization benchmark")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    for count in (50, 500):
+        app = build_app(make_rows(count))
+        results = {
+            path: asyncio.run(drive(app, f"/{path}", args.iterations))
+            for path in ("stdlib", "orjson", "trusted")
+        }
+        print(f"{count} rows:")
+        for path, seconds in results.items():
+            speedup = results["stdlib"] / seconds
+            print(f"  {path:>8}: {seconds * 1000:8.3f} ms/request  ({speedup:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Throughput by worker count
+
+Starts the production launcher (server.py) once per worker count, drives it
+over real sockets from several load-generator processes for a fixed
+duration, and reports requests/second and latency percentiles. Rate limiting
+is disabled for the server under test.
+
+Usage (from backend/):
+    python -m benchmarks.throughput [--workers 1 2 4] [--path /] [--duration 10]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers),
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "RATE_LIMIT_ENABLED": "false",
+        "ACCESS_LOG_SAMPLE_RATE": "0",
+    }
+    return subprocess.Popen(
+        [sys.executable, "server.py"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+def wait_ready(url: str, workers: int, timeout: float = 30.0):
+    """Wait until the server answers; give the remaining workers a moment to boot"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            time.sleep(0.5 * workers)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server did not start within {timeout}s")
+
+async def _drive(url: str, concurrency: int, duration: float) -> Tuple[List[float], int]:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=10.0) as client:
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+def load_process(args: Tuple[str, int, float]) -> Tuple[List[float], int]:
+    url, concurrency, duration = args
+    return asyncio.run(_drive(url, concurrency, duration))
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def run(workers: int, path: str, duration: float, clients: int, concurrency: int) -> dict:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    server = start_server(workers, port)
+    try:
+        wait_ready(url, workers)
+        with multiprocessing.Pool(clients) as pool:
+            results = pool.map(load_process, [(url, concurrency, duration)] * clients)
+    finally:
+        # SIGTERM exercises the graceful shutdown path
+        server.terminate()
+        server.wait(timeout=60)
+
+    latencies = [latency for result in results for latency in result[0]]
+    errors = sum(result[1] for result in results)
+    return {
+        "workers": workers,
+        "rps": len(latencies) / duration,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": errors,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput by worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=2, help="load generator processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="connections per load generator")
+    args = parser.parse_args()
+
+    print(f"GET {args.path} for {args.duration:.0f}s, {args.clients}x{args.concurrency} connections")
+    print(f"{'workers':>8} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for workers in args.workers:
+        result = run(workers, args.path, args.duration, args.clients, args.concurrency)
+        print(
+            f"{result['workers']:>8} {result['rps']:>10.0f} {result['p50_ms']:>8.2f} "
+            f"{result['p99_ms']:>8.2f} {result['errors']:>7}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Peak memory per image upload: buffered form parsing vs streaming
+
+Feeds a multipart body to each upload path in 64KB ASGI messages (as
+uvicorn delivers it) and records the tracemalloc peak and how much of the
+body was read before the upload finished or was rejected. Storage is a
+local transport that drains the request stream, so only the API side of
+the upload is measured.
+
+  buffered   the previous path: request.form() + UploadFile.read() + upload of the bytes
+  streaming  MultipartFileStream -> StorageService.upload_image
+
+Usage (from backend/):
+    python -m benchmarks.upload_memory [--sizes-mb 0.5 4.5 20]
+"""
+import argparse
+import asyncio
+import os
+import tracemalloc
+from typing import Tuple
+
+# Nothing leaves the process, but the storage service needs a configured project
+os.environ.setdefault("SUPABASE_URL", "http://storage.invalid")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.benchmark")
+
+import httpx
+from fastapi import HTTPException
+from starlette.requests import Request
+from app.services.http_client import http_clients
+from app.services.storage_service import MAX_IMAGE_BYTES, storage_service
+from app.services.supabase_clients import supabase_clients
+from app.utils.multipart_stream import MultipartFileStream
+
+CHUNK = 64 * 1024
+BOUNDARY = b"benchmarkboundary"
+FILLER = b"\0" * CHUNK
+
+class DrainTransport(httpx.AsyncBaseTransport):
+    """Stand-in for Supabase Storage: reads and discards the request body"""
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        async for _ in request.stream:
+            pass
+        return httpx.Response(200, json={"Key": "benchmark"})
+
+def make_request(file_size: int) -> Tuple[Request, list]:
+    """A multipart upload request whose body is generated as it is received"""
+    prefix = (
+        b"--" + BOUNDARY + b"\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="photo.png"\r\n'
+        b"Content-Type: image/png\r\n\r\n"
+        b"\x89PNG\r\n\x1a\n"
+    )
+    suffix = b"\r\n--" + BOUNDARY + b"--\r\n"
+    remaining = file_size - 8
+    consumed = [0]
+    sent_prefix = [False]
+
+    async def receive():
+        if not sent_prefix[0]:
+            sent_prefix[0] = True
+            body = prefix
+        else:
+            nonlocal remaining
+            step = min(CHUNK, remaining)
+            remaining -= step
+            body = FILLER[:step] if step else suffix
+        consumed[0] += len(body)
+        return {"type": "http.request", "body": body, "more_body": body is not suffix}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/upload/image",
+        "headers": [(b"content-type", b"multipart/form-data; boundary=" + BOUNDARY)],
+        "query_string": b"",
+    }
+    return Request(scope, receive), consumed
+
+async def buffered_upload(request: Request):
+    form = await request.form()
+    content = await form["file"].read()
+    if len(content) > MAX_IMAGE_BYTES:
+        raise HTTPException(status_code=400, detail="File too large. Maximum size: 5MB")
+    await http_clients.request("storage", "POST", "http://storage.invalid/object", content=content)
+
+async def streaming_upload(request: Request):
+    await storage_service.upload_image(MultipartFileStream(request, "file"), "benchmark-user", "posts")
+
+async def measure(upload, file_size: int) -> Tuple[float, float, str]:
+    request, consumed = make_request(file_size)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        await upload(request)
+        outcome = "stored"
+    except HTTPException as e:
+        outcome = str(e.status_code)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024, consumed[0] / 1024 / 1024, outcome
+
+async def run(sizes_mb):
+    # Route storage uploads to the draining transport instead of the network
+    http_clients._clients["storage"] = httpx.AsyncClient(transport=DrainTransport())
+    # Built once per process in the app lifespan; keep it out of the first measurement
+    supabase_clients.warm()
+    print(f"{'file MB':>8} {'path':<10} {'peak MB':>8} {'read MB':>8} {'result':>7}")
+    for size_mb in sizes_mb:
+        file_size = int(size_mb * 1024 * 1024)
+        for label, upload in (("buffered", buffered_upload), ("streaming", streaming_upload)):
+            peak, read, outcome = await measure(upload, file_size)
+            print(f"{size_mb:>8} {label:<10} {peak:>8.2f} {read:>8.2f} {outcome:>7}")
+    await http_clients.aclose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory per image upload")
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[0.5, 4.5, 20])
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes_mb))
+
+if __name__ == "__main__":
+    main()
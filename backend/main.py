@@ -1,36 +1,92 @@
-import os
+import asyncio
+import logging
+import signal
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
+from app.config import get_settings, reload_settings
 from app.api.v1 import posts, users, notifications, comments, neighbourhoods, upload, marketplace, businesses, auth, likes
 
 # Import middleware
-from app.middleware.error_handler import ErrorHandlerMiddleware
-from app.middleware.request_logger import RequestLoggerMiddleware
-from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.request_pipeline import RequestPipelineMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.rate_limit import RateLimiter
+from app.middleware.request_logger import access_logger
+from app.services.http_client import http_clients
+from app.services.auth_executor import auth_executor
+from app.utils.metrics import request_metrics
+from app.services.system_sampler import system_sampler
+from app.services.health_probes import dependency_prober
+from app.services.image_derivatives import image_derivatives
+from app.services.neighbourhood_catalog import neighbourhood_catalog
+from app.services.supabase_clients import supabase_clients
+from app.utils.responses import DefaultJSONResponse
 
-load_dotenv()
+settings = get_settings()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    loop = asyncio.get_running_loop()
+    # Re-read settings on SIGHUP (not available on Windows)
+    if hasattr(signal, "SIGHUP"):
+        try:
+            loop.add_signal_handler(signal.SIGHUP, reload_settings)
+        except (NotImplementedError, RuntimeError) as e:
+            logging.getLogger(__name__).warning(f"SIGHUP settings reload unavailable: {e}")
+    access_logger.start()
+    # Open outbound HTTP pools and build the shared Supabase clients before the first request
+    http_clients.open()
+    await asyncio.to_thread(supabase_clients.warm)
+    system_sampler.start()
+    dependency_prober.start()
+    # Load the neighbourhood catalog and keep it current
+    neighbourhood_catalog.start()
+    # Publish this worker's metrics for multi-worker /metrics aggregation
+    metrics_flusher = asyncio.create_task(request_metrics.run_flusher()) if request_metrics.multiproc_dir else None
+    yield
+    await system_sampler.stop()
+    await dependency_prober.stop()
+    await neighbourhood_catalog.stop()
+    if metrics_flusher:
+        metrics_flusher.cancel()
+        # A stopped worker's gauges must not linger in the merged /metrics
+        request_metrics.remove_snapshot()
+    # Close pooled outbound HTTP connections
+    await http_clients.aclose()
+    auth_executor.shutdown()
+    image_derivatives.shutdown()
+    # Flush queued access log records
+    access_logger.stop()
+    if hasattr(signal, "SIGHUP"):
+        try:
+            loop.remove_signal_handler(signal.SIGHUP)
+        except (NotImplementedError, RuntimeError):
+            pass
 
 app = FastAPI(
     title="Neighbourhood Social Network API",
     version="1.0.0",
-    description="Hyper-local social network API for South African neighbourhoods"
+    description="Hyper-local social network API for South African neighbourhoods",
+    lifespan=lifespan,
+    default_response_class=DefaultJSONResponse
 )
 
-# Add middleware (order matters - first added is outermost)
-app.add_middleware(ErrorHandlerMiddleware)
-app.add_middleware(RequestLoggerMiddleware)
-
+# Add middleware (order matters - last added is outermost)
 # Rate limiting (configurable via environment)
-rate_limit_enabled = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
-if rate_limit_enabled:
-    requests_per_minute = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
-    app.add_middleware(RateLimitMiddleware, requests_per_minute=requests_per_minute)
+rate_limiter = None
+if settings.rate_limit_enabled:
+    rate_limiter = RateLimiter(requests_per_minute=settings.rate_limit_per_minute)
+
+# gzip/brotli for bodies over the threshold (innermost, so metrics see wire sizes)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
+
+# Request IDs, access logging, rate limiting and error envelopes in one ASGI layer
+app.add_middleware(RequestPipelineMiddleware, rate_limiter=rate_limiter)
 
 # CORS middleware
 # Get allowed origins from environment or default to wildcard for dev
-allowed_origins = os.getenv("CORS_ORIGINS", "*").split(",")
-if allowed_origins == ["*"] and os.getenv("ENVIRONMENT") == "production":
+allowed_origins = settings.cors_origins.split(",")
+if allowed_origins == ["*"] and settings.environment == "production":
     # In production, require explicit CORS configuration
     allowed_origins = []  # Will fail if not configured
     print("WARNING: CORS_ORIGINS not set in production!")
@@ -57,15 +113,18 @@ app.include_router(businesses.router, prefix="/api/v1/businesses", tags=["busine
 app.include_router(likes.router, prefix="/api/v1", tags=["likes"])
 
 from app.api.v1 import health as health_api
+from app.api.v1 import metrics as metrics_api
 
 # Include health check router
 app.include_router(health_api.router, prefix="/health", tags=["health"])
+app.include_router(metrics_api.router, tags=["monitoring"])
 
 @app.get("/")
 async def root():
     return {"message": "Neighbourhood Social Network API"}
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Production launcher (worker pool, uvloop/httptools, graceful shutdown)
+    import server
+    server.main()
 
@@ -0,0 +1,103 @@
+"""
+Production server entrypoint
+
+Runs main:app under uvicorn with one worker process per available CPU
+(WEB_CONCURRENCY overrides), uvloop and httptools when installed, and a
+graceful shutdown: on SIGTERM/SIGINT each worker stops accepting connections,
+waits up to GRACEFUL_SHUTDOWN_TIMEOUT seconds for in-flight requests, then
+runs the app lifespan shutdown (flushes the access log queue and metrics,
+closes HTTP pools and the auth executor).
+
+Usage (from backend/):
+    python server.py
+"""
+import logging
+import os
+import shutil
+import tempfile
+import uvicorn
+from app.config import get_settings
+
+# uvloop and httptools come with uvicorn[standard]; fall back to the pure-Python stack
+try:
+    import uvloop  # noqa: F401
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+try:
+    import httptools  # noqa: F401
+    HTTPTOOLS_AVAILABLE = True
+except ImportError:
+    HTTPTOOLS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+def _cgroup_cpu_limit() -> float:
+    """CPU quota from cgroup v2 (containers), or 0 if unlimited/unknown"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+    except (OSError, ValueError):
+        return 0
+    if quota == "max":
+        return 0
+    return int(quota) / int(period)
+
+def available_cpus() -> int:
+    """CPUs this process may run on, honouring affinity masks and container quotas"""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpu_limit()
+    if quota:
+        cpus = min(cpus, max(1, int(quota)))
+    return max(1, cpus)
+
+def worker_count() -> int:
+    settings = get_settings()
+    return settings.web_concurrency or available_cpus()
+
+def prepare_metrics_dir(workers: int):
+    """
+    Give multi-worker runs a shared METRICS_MULTIPROC_DIR so /metrics
+    aggregates across workers; stale snapshots from a previous run are removed
+    """
+    if workers < 2:
+        return
+    metrics_dir = get_settings().metrics_multiproc_dir
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir, exist_ok=True)
+    else:
+        metrics_dir = tempfile.mkdtemp(prefix="metrics-")
+    # Workers are spawned processes and read their settings from the environment
+    os.environ["METRICS_MULTIPROC_DIR"] = metrics_dir
+
+def main():
+    settings = get_settings()
+    workers = worker_count()
+    prepare_metrics_dir(workers)
+    logger.info(
+        f"Starting {workers} worker(s) on {settings.host}:{settings.port} "
+        f"(loop={'uvloop' if UVLOOP_AVAILABLE else 'asyncio'}, http={'httptools' if HTTPTOOLS_AVAILABLE else 'h11'})"
+    )
+    uvicorn.run(
+        "main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=workers,
+        loop="uvloop" if UVLOOP_AVAILABLE else "asyncio",
+        http="httptools" if HTTPTOOLS_AVAILABLE else "h11",
+        lifespan="on",
+        # Requests are logged by RequestPipelineMiddleware
+        access_log=False,
+        proxy_headers=True,
+        timeout_keep_alive=settings.keepalive_timeout,
+        timeout_graceful_shutdown=settings.graceful_shutdown_timeout,
+    )
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    main()
@@ -0,0 +1,115 @@
+-- Marketplace search benchmark: ILIKE scan vs ranked tsvector search at 1M listings
+--
+-- Run against a scratch/staging database that already has
+-- marketplace_search_migration.sql applied (the RPC is called as-is):
+--     psql "$DATABASE_URL" -f database/benchmarks/marketplace_search_1m.sql
+--
+-- Everything is created in the search_bench schema and dropped at the end.
+-- search_path makes the RPC resolve marketplace_items/users to the bench copies.
+
+\set ON_ERROR_STOP on
+\timing on
+
+DROP SCHEMA IF EXISTS search_bench CASCADE;
+CREATE SCHEMA search_bench;
+SET search_path = search_bench, public;
+
+CREATE TABLE search_bench.users (
+    id UUID PRIMARY KEY,
+    name VARCHAR(255),
+    phone VARCHAR(20)
+);
+
+CREATE TABLE search_bench.marketplace_items (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL,
+    neighbourhood_id UUID NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    description TEXT,
+    price DECIMAL(10, 2) NOT NULL,
+    category VARCHAR(100),
+    condition VARCHAR(20) DEFAULT 'used',
+    status VARCHAR(20) DEFAULT 'available',
+    image_url TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(description, '')), 'B')
+    ) STORED
+);
+
+-- 1M listings over 200 neighbourhoods, built from small word lists
+INSERT INTO search_bench.marketplace_items
+    (user_id, neighbourhood_id, title, description, price, category, status, created_at)
+SELECT
+    md5('user' || (n % 50000))::uuid,
+    md5('hood' || (n % 200))::uuid,
+    initcap(adjective[1 + n % 12]) || ' ' || noun[1 + (n / 12) % 20],
+    'Selling my ' || adjective[1 + (n / 7) % 12] || ' ' || noun[1 + (n / 3) % 20]
+        || ', ' || detail[1 + n % 8] || '. Collection in ' || suburb[1 + n % 10] || '.',
+    (10 + (n * 37) % 20000)::decimal / 2,
+    category[1 + n % 5],
+    CASE WHEN n % 10 = 0 THEN 'sold' ELSE 'available' END,
+    NOW() - (n || ' minutes')::interval
+FROM generate_series(1, 1000000) AS n,
+    (SELECT
+        ARRAY['wooden', 'leather', 'vintage', 'electric', 'kids', 'outdoor', 'steel', 'glass',
+              'antique', 'portable', 'corner', 'folding'] AS adjective,
+        ARRAY['couch', 'table', 'bicycle', 'fridge', 'lamp', 'desk', 'wardrobe', 'kettle',
+              'television', 'mattress', 'stove', 'guitar', 'pram', 'heater', 'bookshelf',
+              'microwave', 'chair', 'generator', 'speaker', 'cot'] AS noun,
+        ARRAY['barely used', 'some scratches', 'like new', 'needs a service', 'original box',
+              'moving sale', 'price negotiable', 'must go this week'] AS detail,
+        ARRAY['Soweto', 'Khayelitsha', 'Umlazi', 'Sandton', 'Observatory', 'Mamelodi',
+              'Durbanville', 'Tembisa', 'Berea', 'Rondebosch'] AS suburb,
+        ARRAY['furniture', 'electronics', 'appliances', 'kids', 'other'] AS category
+    ) AS words;
+
+-- Indexes from marketplace_schema.sql and marketplace_search_migration.sql
+CREATE INDEX ON search_bench.marketplace_items(neighbourhood_id);
+CREATE INDEX ON search_bench.marketplace_items(created_at DESC);
+CREATE INDEX ON search_bench.marketplace_items USING GIN (search_vector);
+ANALYZE search_bench.marketplace_items;
+
+\echo '--- Before: ILIKE on title/description (previous search_marketplace_items) ---'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT *
+FROM search_bench.marketplace_items
+WHERE (title ILIKE '%guitar%' OR description ILIKE '%guitar%')
+  AND status = 'available'
+ORDER BY created_at DESC
+LIMIT 50;
+
+\echo '--- Before: ILIKE within one neighbourhood ---'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT *
+FROM search_bench.marketplace_items
+WHERE (title ILIKE '%guitar%' OR description ILIKE '%guitar%')
+  AND status = 'available'
+  AND neighbourhood_id = md5('hood7')::uuid
+ORDER BY created_at DESC
+LIMIT 50;
+
+\echo '--- After: ranked RPC, whole catalogue ---'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM public.search_marketplace_items('guitar');
+
+\echo '--- After: ranked RPC, one neighbourhood + category + price ---'
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM public.search_marketplace_items(
+    'vintage guitar', md5('hood7')::uuid, 'kids', 0, 5000
+);
+
+\echo '--- After: ranked RPC, second page via cursor ---'
+SELECT rank AS cursor_rank, id AS cursor_id
+FROM public.search_marketplace_items('guitar', NULL, NULL, NULL, NULL, 50)
+ORDER BY rank ASC, id ASC
+LIMIT 1 \gset
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM public.search_marketplace_items(
+    'guitar', NULL, NULL, NULL, NULL, 50, :cursor_rank, :'cursor_id'
+);
+
+RESET search_path;
+DROP SCHEMA search_bench CASCADE;
@@ -0,0 +1,86 @@
+-- Business coordinates and proximity search
+-- Run this in your Supabase SQL Editor (after schema.sql)
+--
+-- Adds latitude/longitude to businesses (filled by the API's geocoder at
+-- create/update time) and a nearby_businesses RPC. The GiST index on
+-- ll_to_earth() lets earth_box() prune to the search radius before exact
+-- distances are computed, so a "near me" query reads only nearby rows.
+
+CREATE EXTENSION IF NOT EXISTS cube;
+CREATE EXTENSION IF NOT EXISTS earthdistance;
+
+ALTER TABLE businesses
+    ADD COLUMN IF NOT EXISTS latitude DECIMAL(10, 8),
+    ADD COLUMN IF NOT EXISTS longitude DECIMAL(11, 8);
+
+CREATE INDEX IF NOT EXISTS idx_businesses_location
+    ON businesses USING GIST (ll_to_earth(latitude::FLOAT8, longitude::FLOAT8))
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+
+-- Businesses within radius_m metres of a point, nearest first
+CREATE OR REPLACE FUNCTION nearby_businesses(
+    origin_lat DOUBLE PRECISION,
+    origin_lon DOUBLE PRECISION,
+    radius_m DOUBLE PRECISION DEFAULT 2000,
+    filter_category TEXT DEFAULT NULL,
+    result_limit INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    id UUID,
+    user_id UUID,
+    neighbourhood_id UUID,
+    name VARCHAR,
+    description TEXT,
+    category VARCHAR,
+    phone VARCHAR,
+    email VARCHAR,
+    website TEXT,
+    address TEXT,
+    image_url TEXT,
+    latitude DECIMAL,
+    longitude DECIMAL,
+    created_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE,
+    "user" JSONB,
+    distance_m DOUBLE PRECISION
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        b.id,
+        b.user_id,
+        b.neighbourhood_id,
+        b.name,
+        b.description,
+        b.category,
+        b.phone,
+        b.email,
+        b.website,
+        b.address,
+        b.image_url,
+        b.latitude,
+        b.longitude,
+        b.created_at,
+        b.updated_at,
+        jsonb_build_object('id', u.id, 'name', u.name, 'phone', u.phone) AS "user",
+        d.distance_m
+    FROM businesses b
+    CROSS JOIN LATERAL (
+        SELECT earth_distance(
+            ll_to_earth(origin_lat, origin_lon),
+            ll_to_earth(b.latitude::FLOAT8, b.longitude::FLOAT8)
+        ) AS distance_m
+    ) d
+    LEFT JOIN users u ON u.id = b.user_id
+    WHERE b.latitude IS NOT NULL
+      AND b.longitude IS NOT NULL
+      AND earth_box(ll_to_earth(origin_lat, origin_lon), radius_m)
+          @> ll_to_earth(b.latitude::FLOAT8, b.longitude::FLOAT8)
+      AND d.distance_m <= radius_m
+      AND (filter_category IS NULL OR b.category = filter_category)
+    ORDER BY d.distance_m, b.id
+    LIMIT LEAST(GREATEST(result_limit, 1), 200);
+$$;
+
+GRANT EXECUTE ON FUNCTION nearby_businesses(DOUBLE PRECISION, DOUBLE PRECISION, DOUBLE PRECISION, TEXT, INTEGER)
+    TO anon, authenticated, service_role;
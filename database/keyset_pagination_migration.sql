@@ -0,0 +1,37 @@
+-- Keyset pagination indexes for marketplace and business listings
+-- Run this in your Supabase SQL Editor (after marketplace_schema.sql)
+--
+-- The list endpoints order by (created_at DESC, id DESC) and page with
+-- "created_at < x OR (created_at = x AND id < y)". Each index below leads with
+-- the equality filters of one query shape and ends with the sort key, so a
+-- page is a short index range scan with no sort, however deep it is.
+
+-- Marketplace: the list always filters on status (default 'available').
+-- Partial indexes keep the hot 'available' path small.
+CREATE INDEX IF NOT EXISTS idx_marketplace_available_neighbourhood_created
+    ON marketplace_items(neighbourhood_id, created_at DESC, id DESC)
+    WHERE status = 'available';
+
+CREATE INDEX IF NOT EXISTS idx_marketplace_available_neighbourhood_category_created
+    ON marketplace_items(neighbourhood_id, category, created_at DESC, id DESC)
+    WHERE status = 'available';
+
+-- Any status (sold/pending listings, "my listings")
+CREATE INDEX IF NOT EXISTS idx_marketplace_status_neighbourhood_created
+    ON marketplace_items(status, neighbourhood_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_marketplace_user_created
+    ON marketplace_items(user_id, created_at DESC, id DESC);
+
+-- Businesses
+CREATE INDEX IF NOT EXISTS idx_businesses_neighbourhood_created
+    ON businesses(neighbourhood_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_businesses_neighbourhood_category_created
+    ON businesses(neighbourhood_id, category, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_businesses_user_created
+    ON businesses(user_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_businesses_created
+    ON businesses(created_at DESC, id DESC);
@@ -0,0 +1,81 @@
+-- Marketplace facets migration
+-- Run this in your Supabase SQL Editor (after marketplace_schema.sql)
+--
+-- One grouped scan returns category, condition and price-bucket counts for a
+-- neighbourhood and filter set. Each facet is counted with every filter
+-- except its own, so picking a category still shows the other categories'
+-- counts.
+
+-- Serves the neighbourhood + status scan the facets (and list) queries start from
+CREATE INDEX IF NOT EXISTS idx_marketplace_neighbourhood_status
+    ON marketplace_items(neighbourhood_id, status);
+
+CREATE OR REPLACE FUNCTION marketplace_facets(
+    filter_neighbourhood_id UUID DEFAULT NULL,
+    filter_category TEXT DEFAULT NULL,
+    filter_condition TEXT DEFAULT NULL,
+    filter_min_price NUMERIC DEFAULT NULL,
+    filter_max_price NUMERIC DEFAULT NULL,
+    filter_status TEXT DEFAULT 'available'
+)
+RETURNS JSONB
+LANGUAGE sql STABLE
+AS $$
+    WITH base AS (
+        SELECT
+            COALESCE(m.category, 'other') AS category,
+            COALESCE(m.condition, 'used') AS condition,
+            -- Buckets (ZAR): 0 <100, 1 100-499, 2 500-999, 3 1000-4999, 4 5000+
+            width_bucket(m.price, ARRAY[100, 500, 1000, 5000]::NUMERIC[]) AS bucket,
+            (filter_category IS NULL OR m.category = filter_category) AS category_ok,
+            (filter_condition IS NULL OR m.condition = filter_condition) AS condition_ok,
+            ((filter_min_price IS NULL OR m.price >= filter_min_price)
+             AND (filter_max_price IS NULL OR m.price <= filter_max_price)) AS price_ok
+        FROM marketplace_items m
+        WHERE (filter_neighbourhood_id IS NULL OR m.neighbourhood_id = filter_neighbourhood_id)
+          AND (filter_status IS NULL OR m.status = filter_status)
+    ),
+    grouped AS (
+        SELECT
+            GROUPING(category) = 0 AS by_category,
+            GROUPING(condition) = 0 AS by_condition,
+            GROUPING(bucket) = 0 AS by_bucket,
+            category,
+            condition,
+            bucket,
+            COUNT(*) FILTER (WHERE condition_ok AND price_ok) AS category_count,
+            COUNT(*) FILTER (WHERE category_ok AND price_ok) AS condition_count,
+            COUNT(*) FILTER (WHERE category_ok AND condition_ok) AS bucket_count,
+            COUNT(*) FILTER (WHERE category_ok AND condition_ok AND price_ok) AS total_count
+        FROM base
+        GROUP BY GROUPING SETS ((category), (condition), (bucket), ())
+    ),
+    buckets(bucket, min_price, max_price) AS (
+        VALUES (0, 0, 100), (1, 100, 500), (2, 500, 1000), (3, 1000, 5000), (4, 5000, NULL)
+    )
+    SELECT jsonb_build_object(
+        'total', COALESCE((
+            SELECT total_count FROM grouped
+            WHERE NOT by_category AND NOT by_condition AND NOT by_bucket
+        ), 0),
+        'categories', COALESCE((
+            SELECT jsonb_object_agg(category, category_count)
+            FROM grouped WHERE by_category AND category_count > 0
+        ), '{}'::JSONB),
+        'conditions', COALESCE((
+            SELECT jsonb_object_agg(condition, condition_count)
+            FROM grouped WHERE by_condition AND condition_count > 0
+        ), '{}'::JSONB),
+        'price_buckets', (
+            SELECT jsonb_agg(
+                jsonb_build_object('min', b.min_price, 'max', b.max_price, 'count', COALESCE(g.bucket_count, 0))
+                ORDER BY b.bucket
+            )
+            FROM buckets b
+            LEFT JOIN grouped g ON g.by_bucket AND g.bucket = b.bucket
+        )
+    );
+$$;
+
+GRANT EXECUTE ON FUNCTION marketplace_facets(UUID, TEXT, TEXT, NUMERIC, NUMERIC, TEXT)
+    TO anon, authenticated, service_role;
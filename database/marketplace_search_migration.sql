@@ -0,0 +1,87 @@
+-- Marketplace full-text search migration
+-- Run this in your Supabase SQL Editor (after marketplace_schema.sql)
+--
+-- Replaces the ILIKE '%q%' search (sequential scan, no relevance) with a
+-- weighted tsvector (title = A, description = B), a GIN index and a ranked
+-- search RPC with keyset (cursor) pagination.
+
+-- Weighted search document, maintained by Postgres on insert/update
+ALTER TABLE marketplace_items
+    ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(description, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_marketplace_search_vector
+    ON marketplace_items USING GIN (search_vector);
+
+-- Ranked search with the same filters as the list endpoint.
+-- Pagination: pass the rank and id of the last row of the previous page as
+-- cursor_rank/cursor_id; rows are ordered by (rank DESC, id DESC).
+CREATE OR REPLACE FUNCTION search_marketplace_items(
+    search_query TEXT,
+    filter_neighbourhood_id UUID DEFAULT NULL,
+    filter_category TEXT DEFAULT NULL,
+    filter_min_price NUMERIC DEFAULT NULL,
+    filter_max_price NUMERIC DEFAULT NULL,
+    result_limit INTEGER DEFAULT 50,
+    cursor_rank REAL DEFAULT NULL,
+    cursor_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    user_id UUID,
+    neighbourhood_id UUID,
+    title VARCHAR,
+    description TEXT,
+    price DECIMAL,
+    category VARCHAR,
+    condition VARCHAR,
+    status VARCHAR,
+    image_url TEXT,
+    created_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE,
+    "user" JSONB,
+    rank REAL
+)
+LANGUAGE sql STABLE
+AS $$
+    WITH ranked AS (
+        SELECT
+            m.*,
+            ts_rank_cd(m.search_vector, q.query) AS item_rank
+        FROM marketplace_items m,
+             websearch_to_tsquery('english', search_query) AS q(query)
+        WHERE m.search_vector @@ q.query
+          AND m.status = 'available'
+          AND (filter_neighbourhood_id IS NULL OR m.neighbourhood_id = filter_neighbourhood_id)
+          AND (filter_category IS NULL OR m.category = filter_category)
+          AND (filter_min_price IS NULL OR m.price >= filter_min_price)
+          AND (filter_max_price IS NULL OR m.price <= filter_max_price)
+    )
+    SELECT
+        r.id,
+        r.user_id,
+        r.neighbourhood_id,
+        r.title,
+        r.description,
+        r.price,
+        r.category,
+        r.condition,
+        r.status,
+        r.image_url,
+        r.created_at,
+        r.updated_at,
+        jsonb_build_object('id', u.id, 'name', u.name, 'phone', u.phone) AS "user",
+        r.item_rank AS rank
+    FROM ranked r
+    LEFT JOIN users u ON u.id = r.user_id
+    WHERE cursor_rank IS NULL
+       OR (r.item_rank, r.id) < (cursor_rank, cursor_id)
+    ORDER BY r.item_rank DESC, r.id DESC
+    LIMIT LEAST(GREATEST(result_limit, 1), 200);
+$$;
+
+GRANT EXECUTE ON FUNCTION search_marketplace_items(TEXT, UUID, TEXT, NUMERIC, NUMERIC, INTEGER, REAL, UUID)
+    TO anon, authenticated, service_role;
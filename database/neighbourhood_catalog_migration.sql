@@ -0,0 +1,19 @@
+-- Neighbourhood catalog change tracking
+-- Run this in your Supabase SQL Editor (after schema.sql)
+--
+-- The API keeps the neighbourhoods table in memory and reloads it when
+-- (row count, max(updated_at)) changes. schema.sql has no updated_at trigger
+-- on neighbourhoods, so edits would go unnoticed until the next restart.
+
+UPDATE neighbourhoods SET updated_at = COALESCE(created_at, NOW()) WHERE updated_at IS NULL;
+
+DROP TRIGGER IF EXISTS update_neighbourhoods_updated_at ON neighbourhoods;
+CREATE TRIGGER update_neighbourhoods_updated_at BEFORE UPDATE ON neighbourhoods
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE INDEX IF NOT EXISTS idx_neighbourhoods_updated ON neighbourhoods(updated_at DESC);
+
+-- Optional, for immediate reloads: in Supabase (Database > Webhooks) add a
+-- webhook on INSERT/UPDATE/DELETE of public.neighbourhoods that POSTs to
+--     https://<api-host>/api/v1/neighbourhoods/catalog/refresh
+-- with the header X-Catalog-Secret: <CATALOG_WEBHOOK_SECRET>.
@@ -0,0 +1,64 @@
+-- Query-shape-aligned indexes
+-- Run this in your Supabase SQL Editor (after every other migration, including
+-- keyset_pagination_migration.sql and marketplace_facets_migration.sql)
+--
+-- Each index leads with the equality filters of one SupabaseService query and
+-- ends with its ORDER BY, so the query is an index range scan that stops at
+-- LIMIT instead of a scan + sort. Single-column indexes that are a leading
+-- prefix of one of these (or of an index from an earlier migration) are
+-- dropped: they add write cost and the planner no longer needs them.
+--
+-- backend/benchmarks/query_plans.py checks the plans against a seeded database.
+
+-- Posts: neighbourhood feed and profile posts (newest first)
+CREATE INDEX IF NOT EXISTS idx_posts_neighbourhood_created
+    ON posts(neighbourhood_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_posts_user_created
+    ON posts(user_id, created_at DESC, id DESC);
+
+DROP INDEX IF EXISTS idx_posts_neighbourhood;
+DROP INDEX IF EXISTS idx_posts_user;
+
+-- Comments: thread under a post (oldest first), activity counts per user
+CREATE INDEX IF NOT EXISTS idx_comments_post_created
+    ON comments(post_id, created_at);
+
+CREATE INDEX IF NOT EXISTS idx_comments_user
+    ON comments(user_id);
+
+DROP INDEX IF EXISTS idx_comments_post;
+
+-- Likes: UNIQUE(post_id, user_id) already serves "did I like it" and the count
+DROP INDEX IF EXISTS idx_post_likes_post;
+
+-- Mentions: UNIQUE(post_id, mentioned_user_id) already serves the lookup by post
+DROP INDEX IF EXISTS idx_post_mentions_post;
+
+-- Marketplace: list without a neighbourhood ("all listings", any status)
+CREATE INDEX IF NOT EXISTS idx_marketplace_status_created
+    ON marketplace_items(status, created_at DESC, id DESC);
+
+-- Covered by idx_marketplace_neighbourhood_status, idx_marketplace_user_created
+-- and idx_marketplace_status_created. Category is only ever filtered together
+-- with status (and usually neighbourhood), which the composites handle.
+DROP INDEX IF EXISTS idx_marketplace_neighbourhood;
+DROP INDEX IF EXISTS idx_marketplace_user;
+DROP INDEX IF EXISTS idx_marketplace_status;
+DROP INDEX IF EXISTS idx_marketplace_category;
+
+-- Businesses: covered by idx_businesses_neighbourhood_created
+DROP INDEX IF EXISTS idx_businesses_neighbourhood;
+
+-- Business search: ILIKE '%q%' on name/description. Trigram indexes turn the
+-- full-table scan into a bitmap scan over the matching rows.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_businesses_name_trgm
+    ON businesses USING GIN (name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_businesses_description_trgm
+    ON businesses USING GIN (description gin_trgm_ops);
+
+-- Users: mention autocomplete filters on neighbourhood first
+-- (idx_users_neighbourhood from schema.sql), nothing to add.
@@ -0,0 +1,13 @@
+-- Storage limits for direct (signed URL) image uploads
+-- Run this in your Supabase SQL Editor (after creating the post-images bucket, see backend/STORAGE_SETUP.md)
+--
+-- POST /api/v1/upload/image/sign lets clients upload straight to Storage, so
+-- the API no longer sees the bytes as they arrive. With these bucket limits
+-- Storage itself refuses oversized or non-image uploads. The API's completion
+-- check (size and magic bytes) still runs, because allowed_mime_types only
+-- compares the client's declared Content-Type.
+
+UPDATE storage.buckets
+SET file_size_limit = 5242880,  -- 5MB, same as MAX_IMAGE_BYTES
+    allowed_mime_types = ARRAY['image/jpeg', 'image/png', 'image/webp', 'image/gif', 'image/avif']
+WHERE id = 'post-images';